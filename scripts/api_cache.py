@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Persistent API response cache for the statistics scripts.
+Stores JSON response bodies with their ETag/Last-Modified validators in
+SQLite, so later runs skip very fresh entries entirely and revalidate the
+rest with conditional requests (GitHub does not charge 304s to the rate limit).
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlite_store import SQLiteStore, conditional_headers
+
+# Configuration
+DEFAULT_API_CACHE_PATH = '.api_cache.sqlite'
+DEFAULT_MAX_AGE = 6 * 60 * 60  # seconds an entry is used without asking the server
+
+class ApiCache(SQLiteStore):
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            body TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            etag TEXT,
+            last_modified TEXT
+        )""",
+    ]
+
+    def __init__(self, path: Path = Path(DEFAULT_API_CACHE_PATH), max_age: float = DEFAULT_MAX_AGE):
+        """Open (or create) the response store at path."""
+        super().__init__(path)
+        self.max_age = max_age
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the stored entry for a key, fresh or not."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, fetched_at, etag, last_modified FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'body': json.loads(row[0]),
+            'fetched_at': row[1],
+            'etag': row[2],
+            'last_modified': row[3]
+        }
+
+    def is_fresh(self, entry: Dict) -> bool:
+        """Whether an entry is recent enough to skip the request entirely."""
+        return time.time() - entry['fetched_at'] < self.max_age
+
+    def lookup(self, key: str) -> Optional[Any]:
+        """Return the body of a fresh entry, counting it as a hit."""
+        entry = self.get(key)
+        if entry and self.is_fresh(entry):
+            self.hits += 1
+            return entry['body']
+        return None
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """Build If-None-Match/If-Modified-Since headers from an entry's validators."""
+        if not entry:
+            return {}
+        return conditional_headers(entry['etag'], entry['last_modified'])
+
+    def store(self, key: str, body: Any, etag: Optional[str] = None,
+              last_modified: Optional[str] = None) -> None:
+        """Store a fresh response body and its validators."""
+        self.misses += 1
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, fetched_at, etag, last_modified) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(body), time.time(), etag, last_modified)
+            )
+            self._conn.commit()
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as confirmed unchanged by a 304."""
+        self.revalidated += 1
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
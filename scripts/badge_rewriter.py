@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Single-pass badge rewriting for the catalog markdown.
+Walks the document once, looks up each entry's link in a map supplied by the
+caller, and replaces that entry's badges in place, instead of running one
+regex over the whole document per repository or tool.
+"""
+
+import re
+from typing import Callable, Iterable, List, Optional, Pattern, Tuple
+
+# Non-image links, keyed by URL (catalog.ENTRY_PATTERN keys entries by tool name)
+LINK_URL_PATTERN = re.compile(r'(?<!!)\[[^\]]+\]\(([^)]+)\)')
+
+class BadgeRewriter:
+    def __init__(self, link_pattern: Pattern, badge_labels: Iterable[str]):
+        """Rewrite badges after links matched by link_pattern (group 1 is the lookup key).
+
+        Existing badges whose alt text is one of badge_labels are replaced.
+        """
+        self.link_pattern = link_pattern
+        labels = '|'.join(re.escape(label) for label in badge_labels)
+        self.badge_pattern = re.compile(rf' ?!\[(?:{labels})\]\([^)]+\)')
+
+    def rewrite(self, content: str,
+                badges_for: Callable[[str], Optional[List[str]]]) -> Tuple[str, int]:
+        """Return the rewritten document and the number of entries updated.
+
+        badges_for maps a link key to the badges for its entry, or None to leave
+        the entry as is. The first key on a line with badges wins.
+        """
+        lines = content.split('\n')
+        updated = 0
+        for i, line in enumerate(lines):
+            for match in self.link_pattern.finditer(line):
+                badges = badges_for(match.group(1))
+                if not badges:
+                    continue
+                # Keep everything before the link; replace badges after it
+                tail = self.badge_pattern.sub('', line[match.start():]).rstrip()
+                lines[i] = f"{line[:match.start()]}{tail} {' '.join(badges)}"
+                updated += 1
+                break
+        return '\n'.join(lines), updated
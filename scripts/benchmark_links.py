@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for check_links.py.
+Runs check_all_links against a local HTTP stand-in server and a synthetic
+markdown corpus, and reports URLs/sec, p50/p99 latency and peak RSS for each
+execution strategy, so tuning and regressions can be measured offline.
+"""
+
+import argparse
+import contextlib
+import http.server
+import io
+import json
+import multiprocessing
+import random
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Configuration
+DEFAULT_LINKS = 1000
+LINKS_PER_FILE = 1000
+DEFAULT_HOSTS = 4
+
+# Outcome mix of the synthetic corpus (remaining links are plain 200s)
+DEFAULT_RATES = {
+    'redirect': 0.05,
+    '404': 0.03,
+    '429': 0.01,
+    '500': 0.01,
+    'dead': 0.01,
+    'hang': 0.0  # needs --hanging-hosts; each attempt costs a full timeout
+}
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """Answers according to the first path segment: /ok, /redirect, /404, /429, /500."""
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0  # seconds, mean
+    jitter = 0.0  # seconds, uniform +/-
+    reject_head = False
+    retry_after = '0'
+
+    def _respond(self, send_body: bool) -> None:
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        kind = self.path.strip('/').split('/', 1)[0]
+        headers = {}
+        if self.command == 'HEAD' and self.reject_head:
+            status = 405
+        elif kind == 'redirect':
+            status = 302
+            headers['Location'] = '/ok' + self.path[len('/redirect'):]
+        elif kind in ('404', '429', '500'):
+            status = int(kind)
+            if status == 429:
+                headers['Retry-After'] = self.retry_after
+        else:
+            status = 206 if self.headers.get('Range') else 200
+
+        body = b'x' if send_body and status < 300 else b''
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def log_message(self, *args):
+        pass
+
+class StandInServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address) -> None:
+        """Ignore clients closing early (e.g. after a range GET); report anything else."""
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+def _hang(port: int, connections) -> None:
+    """Accept connections on a port and never answer them, counting each one."""
+    listener = socket.socket()
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(('127.0.0.1', port))
+    listener.listen(1024)
+    held = []
+    while True:
+        conn, _ = listener.accept()
+        held.append(conn)
+        with connections.get_lock():
+            connections.value += 1
+
+def _serve(ports: List[int], latency: float, jitter: float, reject_head_ports: List[int],
+           retry_after: str, ready, hanging_ports: List[int] = (), connections=None) -> None:
+    """Run one stand-in server per port until the process is terminated."""
+    for port in hanging_ports:
+        threading.Thread(target=_hang, args=(port, connections), daemon=True).start()
+    for port in ports:
+        handler = type('Handler', (StandInHandler,), {
+            'latency': latency,
+            'jitter': jitter,
+            'reject_head': port in reject_head_ports,
+            'retry_after': retry_after
+        })
+        server = StandInServer(('127.0.0.1', port), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    ready.set()
+    while True:
+        time.sleep(3600)
+
+def _free_ports(count: int) -> List[int]:
+    """Reserve and release ports; closed ports double as dead hosts."""
+    sockets = []
+    for _ in range(count):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        sockets.append(sock)
+    ports = [sock.getsockname()[1] for sock in sockets]
+    for sock in sockets:
+        sock.close()
+    return ports
+
+def generate_corpus(directory: Path, links: int, live_ports: List[int], dead_ports: List[int],
+                    rates: Dict[str, float], seed: int = 0,
+                    hanging_ports: List[int] = ()) -> None:
+    """Write markdown files with the given number of links in the catalog's entry style."""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(links):
+        roll = rng.random()
+        kind = 'ok'
+        for outcome, rate in rates.items():
+            if roll < rate:
+                kind = outcome
+                break
+            roll -= rate
+
+        if kind == 'dead':
+            url = f"http://127.0.0.1:{rng.choice(dead_ports)}/ok/{i}"
+        elif kind == 'hang':
+            url = f"http://127.0.0.1:{rng.choice(hanging_ports)}/ok/{i}"
+        else:
+            url = f"http://127.0.0.1:{rng.choice(live_ports)}/{kind}/{i}"
+        lines.append(f"- **[Tool{i}]({url})** - Synthetic benchmark entry {i}.")
+
+    directory.mkdir(parents=True, exist_ok=True)
+    for n, start in enumerate(range(0, len(lines), LINKS_PER_FILE)):
+        with open(directory / f"corpus_{n:04d}.md", 'w', encoding='utf-8') as f:
+            f.write("# Benchmark corpus\n\n")
+            f.write('\n'.join(lines[start:start + LINKS_PER_FILE]) + '\n')
+
+class LatencyRecorder:
+    """Result sink that keeps only per-URL latencies."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.count = 0
+
+    def write(self, file, line, url, text, is_valid, message, status=None, latency=0.0):
+        self.latencies[url] = latency
+        self.count += 1
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _run_strategy(corpus: str, strategy: str, settings: Dict, queue) -> None:
+    """Run check_all_links in this (fresh) process and report metrics."""
+    import check_links
+    import http_client
+
+    check_links.TIMEOUT = settings['timeout']
+    check_links.MAX_WORKERS = settings['max_workers']
+    check_links.RETRY_ATTEMPTS = settings['retry_attempts']
+    http_client.configure(pool_maxsize=settings['max_workers'])
+
+    recorder = LatencyRecorder()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        check_links.check_all_links(Path(corpus), use_async=(strategy == 'async'),
+                                    max_in_flight=settings['max_in_flight'],
+                                    per_host=settings['per_host'], sink=recorder)
+    elapsed = time.perf_counter() - started
+
+    latencies = list(recorder.latencies.values())
+    queue.put({
+        'strategy': strategy,
+        'links': recorder.count,
+        'unique_urls': len(latencies),
+        'seconds': round(elapsed, 3),
+        'urls_per_sec': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(_percentile(latencies, 50) * 1000, 1),
+        'p99_ms': round(_percentile(latencies, 99) * 1000, 1),
+        'peak_rss_mb': _peak_rss_mb()
+    })
+
+def run_benchmark(links: int, strategies: List[str], settings: Dict, hosts: int = DEFAULT_HOSTS,
+                  dead_hosts: int = 1, latency: float = 0.0, jitter: float = 0.0,
+                  reject_head_hosts: int = 1, retry_after: str = '0',
+                  rates: Optional[Dict[str, float]] = None, hanging_hosts: int = 0) -> List[Dict]:
+    """Start the stand-in server, build a corpus and time each strategy in its own process.
+    
+    Each result also counts the connections opened to hanging hosts, which
+    should stop soon after the circuit breaker marks those hosts down.
+    """
+    rates = DEFAULT_RATES if rates is None else rates
+    ports = _free_ports(hosts + dead_hosts + hanging_hosts)
+    live_ports = ports[:hosts]
+    dead_ports = ports[hosts:hosts + dead_hosts]
+    hanging_ports = ports[hosts + dead_hosts:]
+    if not dead_ports:
+        rates = {k: v for k, v in rates.items() if k != 'dead'}
+    if not hanging_ports:
+        rates = {k: v for k, v in rates.items() if k != 'hang'}
+
+    ctx = multiprocessing.get_context('spawn')
+    ready = ctx.Event()
+    connections = ctx.Value('i', 0)
+    server = ctx.Process(target=_serve, daemon=True, args=(
+        live_ports, latency, jitter, live_ports[:reject_head_hosts], retry_after, ready,
+        hanging_ports, connections
+    ))
+    server.start()
+    ready.wait()
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as corpus:
+            generate_corpus(Path(corpus), links, live_ports, dead_ports, rates,
+                            hanging_ports=hanging_ports)
+            for strategy in strategies:
+                with connections.get_lock():
+                    connections.value = 0
+                queue = ctx.Queue()
+                worker = ctx.Process(target=_run_strategy,
+                                     args=(corpus, strategy, settings, queue))
+                worker.start()
+                result = queue.get()
+                worker.join()
+                result['hang_connections'] = connections.value
+                results.append(result)
+    finally:
+        server.terminate()
+
+    return results
+
+def print_results(results: List[Dict]) -> None:
+    """Print a summary table."""
+    print(f"\n{'='*90}")
+    print("Link Checker Benchmark")
+    print(f"{'='*90}")
+    print(f"{'Strategy':<10} {'Links':>8} {'Unique':>8} {'Seconds':>9} {'URLs/sec':>10} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>8} {'Hang conn':>10}")
+    print("-" * 90)
+    for r in results:
+        rss = f"{r['peak_rss_mb']:.1f}" if r['peak_rss_mb'] is not None else 'n/a'
+        print(f"{r['strategy']:<10} {r['links']:>8} {r['unique_urls']:>8} {r['seconds']:>9.2f} "
+              f"{r['urls_per_sec']:>10.1f} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} {rss:>8} "
+              f"{r['hang_connections']:>10}")
+
+def main():
+    """Main entry point."""
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import check_links
+
+    parser = argparse.ArgumentParser(description="Benchmark check_links.py against a local stand-in server.")
+    parser.add_argument('--links', type=int, default=DEFAULT_LINKS,
+                        help=f"number of links in the synthetic corpus (default: {DEFAULT_LINKS})")
+    parser.add_argument('--strategies', default='threaded,async',
+                        help="comma-separated strategies to compare: threaded, async")
+    parser.add_argument('--hosts', type=int, default=DEFAULT_HOSTS, help="live stand-in hosts")
+    parser.add_argument('--dead-hosts', type=int, default=1, help="hosts that refuse connections")
+    parser.add_argument('--hanging-hosts', type=int, default=0,
+                        help="hosts that accept connections but never answer (use with --hang-rate)")
+    parser.add_argument('--max-hang-connections', type=int, metavar='N',
+                        help="exit with an error if any strategy opens more than N connections "
+                             "to hanging hosts (circuit breaker regression check)")
+    parser.add_argument('--reject-head-hosts', type=int, default=1, help="live hosts that answer HEAD with 405")
+    parser.add_argument('--latency', type=float, default=20, help="mean server latency in ms")
+    parser.add_argument('--jitter', type=float, default=10, help="uniform latency jitter in ms")
+    parser.add_argument('--retry-after', default='0', help="Retry-After value sent with 429s")
+    for outcome, rate in DEFAULT_RATES.items():
+        parser.add_argument(f'--{outcome}-rate', type=float, default=rate,
+                            help=f"share of {outcome} links (default: {rate})")
+    parser.add_argument('--timeout', type=float, default=check_links.TIMEOUT)
+    parser.add_argument('--max-workers', type=int, default=check_links.MAX_WORKERS)
+    parser.add_argument('--retry-attempts', type=int, default=check_links.RETRY_ATTEMPTS)
+    parser.add_argument('--max-in-flight', type=int, default=check_links.ASYNC_MAX_IN_FLIGHT)
+    parser.add_argument('--per-host', type=int, default=check_links.PER_HOST_LIMIT)
+    parser.add_argument('--json', metavar='PATH', help="also save results as JSON")
+    args = parser.parse_args()
+
+    settings = {
+        'timeout': args.timeout,
+        'max_workers': args.max_workers,
+        'retry_attempts': args.retry_attempts,
+        'max_in_flight': args.max_in_flight,
+        'per_host': args.per_host
+    }
+    rates = {outcome: getattr(args, f'{outcome}_rate') for outcome in DEFAULT_RATES}
+    strategies = [s.strip() for s in args.strategies.split(',') if s.strip()]
+
+    print(f"Benchmarking {args.links} links across {args.hosts} hosts "
+          f"({args.latency:.0f}±{args.jitter:.0f} ms latency)...")
+    results = run_benchmark(args.links, strategies, settings, hosts=args.hosts,
+                            dead_hosts=args.dead_hosts, latency=args.latency / 1000,
+                            jitter=args.jitter / 1000, reject_head_hosts=args.reject_head_hosts,
+                            retry_after=args.retry_after, rates=rates,
+                            hanging_hosts=args.hanging_hosts)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'settings': settings, 'links': args.links, 'results': results}, f, indent=2)
+        print(f"\nBenchmark results saved to: {args.json}")
+
+    if args.max_hang_connections is not None:
+        over = [r['strategy'] for r in results if r['hang_connections'] > args.max_hang_connections]
+        if over:
+            print(f"\nToo many connections to hanging hosts (limit {args.max_hang_connections}): "
+                  f"{', '.join(over)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Shared markdown catalog model for the automation scripts.
+Parses every markdown file once into links and tool entries (name, URL,
+description, badges, section, file, line), indexes them by URL, host, GitHub
+owner/repo and tool name, and caches the parse by file content hash so
+unchanged files are never parsed again.
+"""
+
+import hashlib
+import json
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+# Configuration
+DEFAULT_CATALOG_PATH = '.catalog_cache.json'
+CATALOG_VERSION = 1
+
+# Patterns
+LINK_PATTERN = re.compile(r'(!?)\[([^\]]+)\]\(([^)]+)\)')
+ENTRY_PATTERN = re.compile(r'\*\*\[([^\]]+)\]\(([^)]+)\)\*\*\s*[-–—]\s*(.*)')
+BADGE_PATTERN = re.compile(r'\s*!\[([^\]]*)\]\(([^)]+)\)')
+HEADING_PATTERN = re.compile(r'^#{1,6}\s+(.*?)\s*#*\s*$')
+FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+GITHUB_REPO_PATTERN = re.compile(r'^https?://(?:www\.)?github\.com/([\w.-]+)/([\w.-]+)', re.IGNORECASE)
+
+# github.com paths that are not owner/repo
+GITHUB_RESERVED = {'orgs', 'topics', 'sponsors', 'features', 'marketplace', 'apps',
+                   'collections', 'settings', 'about', 'login'}
+
+class Link(NamedTuple):
+    url: str
+    text: str
+    file: str
+    line: int
+    image: bool = False
+
+class Entry(NamedTuple):
+    """A catalog entry: - **[Name](url)** - description badges"""
+    name: str
+    url: str
+    description: str
+    badges: Tuple[Tuple[str, str], ...]  # (alt text, image URL)
+    section: str
+    file: str
+    line: int
+
+def content_hash(data: bytes) -> str:
+    """Hash file contents for change detection."""
+    return hashlib.sha256(data).hexdigest()
+
+def github_repo(url: str) -> Optional[Tuple[str, str]]:
+    """Return (owner, repo) for a github.com repository URL, else None."""
+    match = GITHUB_REPO_PATTERN.match(url.strip())
+    if not match:
+        return None
+    owner, repo = match.groups()
+    if repo.endswith('.git'):
+        repo = repo[:-len('.git')]
+    if owner.lower() in GITHUB_RESERVED or not repo:
+        return None
+    return owner, repo
+
+def parse_markdown(content: str, rel_path: str = '') -> Tuple[List[Link], List[Entry]]:
+    """Parse markdown text into its links and catalog entries."""
+    links = []
+    entries = []
+    section = ''
+    in_fence = False
+
+    for line_num, line in enumerate(content.splitlines(), 1):
+        for image, text, url in LINK_PATTERN.findall(line):
+            links.append(Link(url, text, rel_path, line_num, bool(image)))
+
+        # Headings and entries inside code blocks are examples, not catalog content
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            section = heading.group(1)
+            continue
+
+        entry = ENTRY_PATTERN.search(line)
+        if entry:
+            name, url, rest = entry.groups()
+            badges = tuple(BADGE_PATTERN.findall(rest))
+            description = BADGE_PATTERN.sub('', rest).strip()
+            entries.append(Entry(name, url, description, badges, section, rel_path, line_num))
+
+    return links, entries
+
+class Catalog:
+    def __init__(self, root: Path, cache_path: Optional[Path] = None):
+        """Parse every markdown file under root, reusing cached parses of unchanged files."""
+        self.root = Path(root)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.files = {}
+        self.parsed = 0
+        # URLs per file that were not in its previous (cached) parse
+        self.added_urls: Dict[str, Set[str]] = {}
+        # URLs a consumer asked to see again on the next run (e.g. failed link checks)
+        self.recheck_urls: Set[str] = set()
+
+        cached = self._load_cache()
+        for file_path in sorted(self.root.glob('**/*.md')):
+            rel_path = str(file_path.relative_to(self.root))
+            try:
+                data = file_path.read_bytes()
+            except Exception as e:
+                print(f"Error reading {file_path}: {e}")
+                continue
+
+            digest = content_hash(data)
+            previous = cached.get(rel_path)
+            if previous and previous['hash'] == digest:
+                self.files[rel_path] = previous
+                continue
+
+            links, entries = parse_markdown(data.decode('utf-8', errors='replace'), rel_path)
+            self.files[rel_path] = {
+                'hash': digest,
+                'links': [list(link) for link in links],
+                'entries': [list(entry) for entry in entries]
+            }
+            old_urls = set(link[0] for link in previous['links']) if previous else set()
+            self.added_urls[rel_path] = set(link.url for link in links) - old_urls
+            self.parsed += 1
+
+        self._build_indexes()
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CATALOG_VERSION:
+                self.recheck_urls = set(data.get('recheck_urls', []))
+                return data.get('files', {})
+        except Exception as e:
+            print(f"Ignoring unreadable catalog cache {self.cache_path}: {e}")
+        return {}
+
+    def _build_indexes(self) -> None:
+        self.links: List[Link] = []
+        self.entries: List[Entry] = []
+        self.by_url: Dict[str, List[Link]] = defaultdict(list)
+        self.by_host: Dict[str, List[Link]] = defaultdict(list)
+        self.by_repo: Dict[str, List[Link]] = defaultdict(list)
+        self.by_name: Dict[str, List[Entry]] = defaultdict(list)
+
+        for rel_path, parsed in self.files.items():
+            for values in parsed['links']:
+                link = Link(*values)
+                self.links.append(link)
+                self.by_url[link.url].append(link)
+                self.by_host[(urlsplit(link.url).hostname or '').lower()].append(link)
+                repo = github_repo(link.url)
+                if repo and not link.image:
+                    self.by_repo['/'.join(repo).lower()].append(link)
+            for values in parsed['entries']:
+                name, url, description, badges, section, file, line = values
+                entry = Entry(name, url, description, tuple(tuple(b) for b in badges),
+                              section, file, line)
+                self.entries.append(entry)
+                self.by_name[name.lower()].append(entry)
+
+    def links_in(self, rel_path: str) -> List[Link]:
+        """Links of one file, in document order."""
+        return [Link(*values) for values in self.files.get(rel_path, {}).get('links', [])]
+
+    def entries_in(self, rel_path: str) -> List[Entry]:
+        """Catalog entries of one file, in document order."""
+        return [entry for entry in self.entries if entry.file == rel_path]
+
+    def find(self, name: str) -> List[Entry]:
+        """Entries for a tool name (case-insensitive)."""
+        return self.by_name.get(name.lower(), [])
+
+    def github_repos(self) -> Dict[str, Tuple[str, str]]:
+        """Unique GitHub repositories linked anywhere, as {'owner/repo': (owner, repo)}."""
+        repos = {}
+        for links in self.by_repo.values():
+            owner, repo = github_repo(links[0].url)
+            repos[f"{owner}/{repo}"] = (owner, repo)
+        return repos
+
+    def save(self) -> None:
+        """Write the parse cache to disk."""
+        if self.cache_path is None:
+            return
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CATALOG_VERSION, 'files': self.files,
+                       'recheck_urls': sorted(self.recheck_urls & set(self.by_url))}, f)
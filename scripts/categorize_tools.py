@@ -4,12 +4,20 @@ Tool categorization helper for Awesome Variant Effect Predictors.
 Helps organize and categorize VEP tools based on their characteristics.
 """
 
-import re
 import json
+import argparse
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set, Tuple
 from collections import defaultdict
 
+from catalog import Catalog, DEFAULT_CATALOG_PATH, content_hash, parse_markdown
+from keyword_matcher import KeywordMatcher
+import tfidf_classifier
+from category_store import CategoryStore, DEFAULT_CATEGORY_STORE_PATH
+
+# Configuration
+CATEGORIZATION_VERSION = 1  # bump when matching rules change to recategorize everything
+
 # Category definitions
 CATEGORIES = {
     'methodology': {
@@ -74,9 +82,36 @@ CATEGORIES = {
     }
 }
 
+def description_hash(description: str) -> str:
+    """Hash of a tool description, to detect edits between runs."""
+    return content_hash(description.encode('utf-8'))
+
+def keyword_hashes(table: Dict[str, Dict[str, List[str]]]) -> Dict[str, str]:
+    """Hash of each category type's keywords, so a table edit only invalidates that type."""
+    return {
+        category_type: content_hash(
+            json.dumps([CATEGORIZATION_VERSION, subcategories], sort_keys=True).encode('utf-8'))
+        for category_type, subcategories in table.items()
+    }
+
+def load_categorization(path: Path) -> Dict:
+    """Load a previous run's saved categorization (empty if missing or unreadable)."""
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable categorization {path}: {e}")
+        return {}
+
 class ToolCategorizer:
     def __init__(self):
         """Initialize the categorizer."""
+        self.matcher = KeywordMatcher(CATEGORIES)
+        self.keyword_hashes = keyword_hashes(CATEGORIES)
+        self.recategorized = 0
+        self.reused = 0
         self.tools = {}
         self.categories = defaultdict(lambda: defaultdict(set))
         
@@ -86,14 +121,10 @@ class ToolCategorizer:
         
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+                _, entries = parse_markdown(f.read())
             
-            # Pattern to match tool entries
-            pattern = re.compile(r'\*\*\[([^\]]+)\]\([^)]+\)\*\* - ([^\n]+)')
-            
-            matches = pattern.findall(content)
-            for tool_name, description in matches:
-                tools[tool_name] = description
+            for entry in entries:
+                tools[entry.name] = entry.description
                 
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
@@ -102,28 +133,61 @@ class ToolCategorizer:
     
     def categorize_tool(self, tool_name: str, description: str) -> Dict[str, List[str]]:
         """Categorize a tool based on its description."""
-        tool_categories = defaultdict(list)
+        return self.matcher.match(f"{tool_name} {description}")
+    
+    def categorize_tools(self, tools: List[Tuple[str, str]]) -> List[Dict[str, List[str]]]:
+        """Categorize many (tool name, description) pairs in one pass."""
+        return self.matcher.match_many([f"{name} {description}" for name, description in tools])
+    
+    def analyze_all_tools(self, tools: Dict[str, str], previous: Optional[Dict] = None) -> None:
+        """Analyze and categorize all tools.
         
-        # Convert to lowercase for matching
-        text = f"{tool_name} {description}".lower()
+        With a previous run's saved data, tools whose description is unchanged keep
+        their categories; only category types whose keywords changed are redone.
+        """
+        previous = previous or {}
+        previous_tools = previous.get('tools', {})
+        changed_types = [category_type for category_type, digest in self.keyword_hashes.items()
+                         if previous.get('keyword_hashes', {}).get(category_type) != digest]
         
-        # Check each category type
-        for category_type, subcategories in CATEGORIES.items():
-            for subcategory, keywords in subcategories.items():
-                # Check if any keyword matches
-                for keyword in keywords:
-                    if keyword.lower() in text:
-                        tool_categories[category_type].append(subcategory)
-                        break
+        results = {}
+        fresh = []
+        for tool_name, description in tools.items():
+            old = previous_tools.get(tool_name)
+            if old and old.get('description_hash') == description_hash(description):
+                results[tool_name] = {category_type: subcategories
+                                      for category_type, subcategories in old['categories'].items()
+                                      if category_type in CATEGORIES}
+                self.reused += 1
+            else:
+                fresh.append((tool_name, description))
+        
+        # New or edited tools: every category type
+        for (tool_name, _), categories in zip(fresh, self.categorize_tools(fresh)):
+            results[tool_name] = categories
+        
+        # Unchanged tools: only the category types whose keyword table changed
+        if changed_types and len(fresh) < len(tools):
+            matcher = KeywordMatcher({category_type: CATEGORIES[category_type]
+                                      for category_type in changed_types})
+            fresh_names = set(name for name, _ in fresh)
+            kept = [(name, desc) for name, desc in tools.items() if name not in fresh_names]
+            redone = matcher.match_many([f"{name} {desc}" for name, desc in kept])
+            for (tool_name, _), categories in zip(kept, redone):
+                merged = {category_type: subcategories
+                          for category_type, subcategories in results[tool_name].items()
+                          if category_type not in changed_types}
+                merged.update(categories)
+                # Keep category types in table order
+                results[tool_name] = {category_type: merged[category_type]
+                                      for category_type in CATEGORIES if category_type in merged}
+        self.recategorized = len(fresh)
         
-        return dict(tool_categories)
-    
-    def analyze_all_tools(self, tools: Dict[str, str]) -> None:
-        """Analyze and categorize all tools."""
         for tool_name, description in tools.items():
-            categories = self.categorize_tool(tool_name, description)
+            categories = results[tool_name]
             self.tools[tool_name] = {
                 'description': description,
+                'description_hash': description_hash(description),
                 'categories': categories
             }
             
@@ -132,6 +196,27 @@ class ToolCategorizer:
                 for subcategory in subcategories:
                     self.categories[category_type][subcategory].add(tool_name)
     
+    def suggest_categories(self) -> int:
+        """Suggest categories for uncategorized tools from their most similar categorized tools.
+        
+        Suggestions are stored per tool as {category_type: [[subcategory, confidence]]}.
+        Returns the number of tools that got a suggestion.
+        """
+        names = list(self.tools)
+        texts = [f"{name} {self.tools[name]['description']}" for name in names]
+        labels = [[(category_type, subcategory)
+                   for category_type, subcategories in self.tools[name]['categories'].items()
+                   for subcategory in subcategories]
+                  for name in names]
+        
+        suggestions = tfidf_classifier.TfidfClassifier().suggest(texts, labels)
+        for i, suggested in suggestions.items():
+            tool_suggestions = defaultdict(list)
+            for (category_type, subcategory), confidence in suggested:
+                tool_suggestions[category_type].append([subcategory, round(confidence, 3)])
+            self.tools[names[i]]['suggestions'] = dict(tool_suggestions)
+        return len(suggestions)
+    
     def generate_category_report(self) -> None:
         """Generate a report of tool categories."""
         print(f"\n{'='*60}")
@@ -169,6 +254,12 @@ class ToolCategorizer:
             for tool in sorted(uncategorized):
                 print(f"  - {tool}")
                 print(f"    Description: {self.tools[tool]['description'][:80]}...")
+                suggestions = self.tools[tool].get('suggestions')
+                if suggestions:
+                    suggested = ', '.join(f"{subcategory} ({confidence:.2f})"
+                                          for subcategories in suggestions.values()
+                                          for subcategory, confidence in subcategories)
+                    print(f"    Suggested: {suggested}")
     
     def generate_suggestions(self) -> None:
         """Generate suggestions for improving categorization."""
@@ -203,6 +294,8 @@ class ToolCategorizer:
     def save_categorization(self, output_path: Path) -> None:
         """Save categorization data to JSON."""
         data = {
+            'version': CATEGORIZATION_VERSION,
+            'keyword_hashes': self.keyword_hashes,
             'tools': self.tools,
             'categories': {
                 cat_type: {
@@ -220,6 +313,15 @@ class ToolCategorizer:
 
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Categorize catalog tools by their descriptions.")
+    parser.add_argument('--suggest', action='store_true',
+                        help="suggest categories for uncategorized tools from similar categorized ones "
+                             "(TF-IDF nearest neighbours; requires numpy and scipy)")
+    parser.add_argument('--store', nargs='?', const=DEFAULT_CATEGORY_STORE_PATH, metavar='PATH',
+                        help="also write a SQLite store with an inverted category index for queries "
+                             f"(default path: {DEFAULT_CATEGORY_STORE_PATH} in the repository root)")
+    args = parser.parse_args()
+    
     # Initialize categorizer
     categorizer = ToolCategorizer()
     
@@ -231,20 +333,40 @@ def main():
     readme_path = repo_root / 'README.md'
     if readme_path.exists():
         print("Extracting tools from README.md...")
-        tools = categorizer.extract_tools_from_markdown(readme_path)
+        catalog = Catalog(repo_root, Path(DEFAULT_CATALOG_PATH))
+        catalog.save()
+        tools = {entry.name: entry.description for entry in catalog.entries_in('README.md')}
         print(f"Found {len(tools)} tools")
         
-        # Analyze and categorize
+        # Analyze and categorize, reusing the last run for unchanged tools
         print("\nAnalyzing tool descriptions...")
-        categorizer.analyze_all_tools(tools)
+        output_path = repo_root / 'tool_categories.json'
+        previous = load_categorization(output_path)
+        if previous.get('version') != CATEGORIZATION_VERSION:
+            previous = {}
+        categorizer.analyze_all_tools(tools, previous)
+        print(f"Recategorized {categorizer.recategorized} tools, reused {categorizer.reused} unchanged")
+        
+        if args.suggest:
+            if tfidf_classifier.available():
+                suggested = categorizer.suggest_categories()
+                print(f"Suggested categories for {suggested} uncategorized tools")
+            else:
+                print("Skipping category suggestions: numpy and scipy are not installed")
         
         # Generate reports
         categorizer.generate_category_report()
         categorizer.generate_suggestions()
         
         # Save results
-        output_path = repo_root / 'tool_categories.json'
         categorizer.save_categorization(output_path)
+        
+        if args.store:
+            store_path = repo_root / args.store
+            store = CategoryStore(store_path)
+            store.save(categorizer.tools)
+            store.close()
+            print(f"Category store saved to: {store_path}")
     else:
         print("README.md not found!")
 
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Queryable category store for the tool categorizer.
+Keeps each tool's categories once in SQLite, with an inverted index from
+(category_type, subcategory) to tool IDs, so questions like "all deep_learning
+and splicing tools" are answered by intersecting index entries instead of
+loading and scanning tool_categories.json.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from sqlite_store import SQLiteStore
+
+# Configuration
+DEFAULT_CATEGORY_STORE_PATH = 'tool_categories.sqlite'
+
+class CategoryStore(SQLiteStore):
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS tools (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            description TEXT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS labels (
+            id INTEGER PRIMARY KEY,
+            category_type TEXT NOT NULL,
+            subcategory TEXT NOT NULL,
+            UNIQUE (category_type, subcategory)
+        )""",
+        # Inverted index: clustered by label, so a label's tools are one range scan
+        """CREATE TABLE IF NOT EXISTS postings (
+            label_id INTEGER NOT NULL,
+            tool_id INTEGER NOT NULL,
+            PRIMARY KEY (label_id, tool_id)
+        ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS postings_tool ON postings (tool_id)",
+    ]
+
+    def __init__(self, path: Path = Path(DEFAULT_CATEGORY_STORE_PATH)):
+        """Open (or create) the category store at path."""
+        super().__init__(path)
+
+    def save(self, tools: Dict[str, Dict]) -> None:
+        """Replace the store's contents with {name: {'description', 'categories'}}."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM labels")
+            self._conn.execute("DELETE FROM tools")
+            label_ids = {}
+            for tool_id, (name, tool_data) in enumerate(sorted(tools.items()), 1):
+                self._conn.execute("INSERT INTO tools (id, name, description) VALUES (?, ?, ?)",
+                                   (tool_id, name, tool_data['description']))
+                for category_type, subcategories in tool_data['categories'].items():
+                    for subcategory in subcategories:
+                        label = (category_type, subcategory)
+                        if label not in label_ids:
+                            label_ids[label] = len(label_ids) + 1
+                            self._conn.execute(
+                                "INSERT INTO labels (id, category_type, subcategory) VALUES (?, ?, ?)",
+                                (label_ids[label], category_type, subcategory)
+                            )
+                        self._conn.execute("INSERT INTO postings (label_id, tool_id) VALUES (?, ?)",
+                                           (label_ids[label], tool_id))
+
+    def query(self, *labels: Tuple[str, str]) -> List[str]:
+        """Names of the tools in every given (category_type, subcategory), sorted."""
+        if not labels:
+            return []
+        with self._lock:
+            label_ids = []
+            for category_type, subcategory in labels:
+                row = self._conn.execute(
+                    "SELECT id FROM labels WHERE category_type = ? AND subcategory = ?",
+                    (category_type, subcategory)
+                ).fetchone()
+                if row is None:
+                    return []
+                label_ids.append(row[0])
+            intersection = ' INTERSECT '.join(
+                ["SELECT tool_id FROM postings WHERE label_id = ?"] * len(label_ids))
+            rows = self._conn.execute(
+                f"SELECT name FROM tools WHERE id IN ({intersection}) ORDER BY name", label_ids
+            ).fetchall()
+        return [name for name, in rows]
+
+    def categories(self, name: str) -> Dict[str, List[str]]:
+        """Categories of one tool as {category_type: [subcategories]}."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT l.category_type, l.subcategory FROM tools t "
+                "JOIN postings p ON p.tool_id = t.id JOIN labels l ON l.id = p.label_id "
+                "WHERE t.name = ? ORDER BY l.id", (name,)
+            ).fetchall()
+        categories = {}
+        for category_type, subcategory in rows:
+            categories.setdefault(category_type, []).append(subcategory)
+        return categories
+
+    def counts(self) -> Dict[Tuple[str, str], int]:
+        """Number of tools per (category_type, subcategory)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT l.category_type, l.subcategory, COUNT(*) FROM labels l "
+                "JOIN postings p ON p.label_id = l.id GROUP BY l.id"
+            ).fetchall()
+        return {(category_type, subcategory): count for category_type, subcategory, count in rows}
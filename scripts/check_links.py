@@ -7,117 +7,631 @@ Validates all URLs in markdown files and reports broken links.
 import re
 import sys
 import time
+import threading
+import zlib
+import subprocess
+import asyncio
+import argparse
 import requests
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Tuple, Dict
+from collections import defaultdict
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, List, Tuple, Dict, Optional, Set
+
+import http_client
+from link_cache import LinkCache, DEFAULT_CACHE_PATH, DEFAULT_TTL, canonical_url, normalize_url
+from catalog import Catalog, DEFAULT_CATALOG_PATH, parse_markdown
+from result_sink import ResultSink, load_results, merge_results
+from retry_scheduler import Probe, CircuitBreaker, RetryQueue, is_retryable, retry_delay
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is only needed for --async mode
+    aiohttp = None
 
 # Configuration
 TIMEOUT = 10  # seconds
 MAX_WORKERS = 10  # concurrent requests
 RETRY_ATTEMPTS = 2
+ASYNC_MAX_IN_FLIGHT = 200  # concurrent requests in --async mode
+PER_HOST_LIMIT = 4  # concurrent requests to a single host in --async mode
 USER_AGENT = "Mozilla/5.0 (compatible; awesome-vep-linkchecker/1.0)"
+RANGE_HEADER = {'Range': 'bytes=0-0'}  # fetch a single byte when HEAD is not usable
+# HEAD answers that may just mean the server mishandles HEAD; they are retried with
+# a range GET. 429 and 5xx are returned as they are so the scheduler can back off.
+HEAD_REJECTED_STATUSES = {400, 403, 404, 405, 501}
+DEFAULT_INDEX_PATH = '.link_index.json'  # catalog snapshot as of the last --incremental run
 
-# Patterns to extract URLs from markdown
-URL_PATTERN = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+# Patterns
 SHIELD_IO_PATTERN = re.compile(r'https://img\.shields\.io/.*')
 GITHUB_API_PATTERN = re.compile(r'https://api\.github\.com/.*')
 
+def extract_urls_from_text(content: str) -> List[Tuple[str, str, int]]:
+    """Extract all URLs from markdown text."""
+    links, _ = parse_markdown(content)
+    # Skip shields.io badges (they're dynamically generated)
+    return [(link.url, link.text, link.line) for link in links
+            if not SHIELD_IO_PATTERN.match(link.url)]
+
 def extract_urls_from_file(file_path: Path) -> List[Tuple[str, str, int]]:
     """Extract all URLs from a markdown file."""
-    urls = []
-    
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                matches = URL_PATTERN.findall(line)
-                for text, url in matches:
-                    # Skip shields.io badges (they're dynamically generated)
-                    if not SHIELD_IO_PATTERN.match(url):
-                        urls.append((url, text, line_num))
+            return extract_urls_from_text(f.read())
     except Exception as e:
         print(f"Error reading {file_path}: {e}")
     
-    return urls
+    return []
+
+def _git(base_path: Path, *args: str) -> Optional[str]:
+    """Run a git command in base_path, returning stdout or None on failure."""
+    result = subprocess.run(['git', '-C', str(base_path), *args],
+                            capture_output=True, text=True, encoding='utf-8', errors='replace')
+    if result.returncode != 0:
+        return None
+    return result.stdout
+
+def changed_urls_since(base_path: Path, revision: str) -> Set[str]:
+    """Return URLs present in the working tree but not at a git revision."""
+    changed = _git(base_path, 'diff', '--name-only', '--relative', revision, '--', '*.md')
+    if changed is None:
+        raise RuntimeError(f"git diff against {revision} failed")
+    untracked = _git(base_path, 'ls-files', '--others', '--exclude-standard', '--', '*.md') or ''
+    
+    added = set()
+    for rel_path in set(changed.splitlines() + untracked.splitlines()):
+        file_path = base_path / rel_path
+        if not file_path.exists():
+            continue
+        old_content = _git(base_path, 'show', f"{revision}:./{rel_path}") or ''
+        old_urls = set(url for url, _, _ in extract_urls_from_text(old_content))
+        added.update(url for url, _, _ in extract_urls_from_file(file_path) if url not in old_urls)
+    
+    return added
+
+def shard_for_url(url: str, shards: int) -> int:
+    """Assign a URL to a shard (1-based) by a stable hash of its host.
+    
+    Every URL on a host lands in the same shard, so per-host limits still hold.
+    """
+    return zlib.crc32(_host(url).encode('utf-8')) % shards + 1
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse an 'i/N' shard spec."""
+    try:
+        index, total = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
+    if not 1 <= index <= total:
+        raise argparse.ArgumentTypeError(f"shard index must be between 1 and {total}")
+    return index, total
+
+def _record(cache: Optional[LinkCache], probe: Probe) -> Tuple[str, bool, str]:
+    """Store a final check result in the cache (if any) and return it."""
+    if cache is not None:
+        response_headers = probe.headers or {}
+        cache.record(probe.url, probe.is_valid, probe.status, probe.message,
+                     response_headers.get('ETag'), response_headers.get('Last-Modified'))
+        # Also cache the redirect target so other URLs resolving to it can skip the network
+        if probe.is_valid and probe.final_url and normalize_url(probe.final_url) != normalize_url(probe.url):
+            cache.record(probe.final_url, True, probe.status, probe.message)
+    return probe.url, probe.is_valid, probe.message
+
+class LinkMemo:
+    """What one run has learned about hosts and resources.
+    
+    head_support: per host, whether HEAD requests are answered correctly; hosts
+    known to reject HEAD go straight to a range-limited GET.
+    redirects: canonical URL of every redirect hop -> normalized final URL.
+    verified: final URLs confirmed reachable during this run.
+    head_support and redirects can be seeded from (and saved to) the cache.
+    """
+    
+    def __init__(self, head_support: Optional[Dict[str, bool]] = None,
+                 redirects: Optional[Dict[str, str]] = None):
+        self.head_support: Dict[str, bool] = dict(head_support or {})
+        self.redirects: Dict[str, str] = dict(redirects or {})
+        self.verified: Dict[str, Probe] = {}
+    
+    def remember_redirects(self, probe: Probe) -> None:
+        """Store a successful probe's redirect chain and verified target."""
+        if not probe.is_valid or not probe.final_url:
+            return
+        target = normalize_url(probe.final_url)
+        self.verified[canonical_url(target)] = probe
+        for hop in (probe.url, *probe.redirects):
+            if canonical_url(hop) != canonical_url(target):
+                self.redirects[canonical_url(hop)] = target
+    
+    def known_result(self, url: str) -> Optional[Probe]:
+        """Reuse the result for a URL whose resource (or redirect target) was already verified."""
+        key = canonical_url(url)
+        target = self.redirects.get(key)
+        verified = self.verified.get(canonical_url(target) if target else key)
+        if verified is None:
+            return None
+        return Probe(url, True, verified.message, verified.status, final_url=verified.final_url)
+
+def _representative(urls: List[str]) -> str:
+    """Pick the variant to request for a resource: https first, then without a fragment."""
+    return min(urls, key=lambda url: (not url.lower().startswith('https:'), '#' in url, url))
+
+_session = None
+_session_lock = threading.Lock()
 
-def check_url(url: str, retries: int = RETRY_ATTEMPTS) -> Tuple[str, bool, str]:
-    """Check if a URL is accessible."""
+def _get_session() -> requests.Session:
+    """Pooled session without transport retries; the checker schedules its own."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = http_client.create_session(max_retries=0)
+        return _session
+
+def _host(url: str) -> str:
+    """Return the lowercased host (with any explicit port) of a URL."""
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    try:
+        return f"{host}:{parts.port}" if parts.port else host
+    except ValueError:
+        return host
+
+def _is_ok(status: int) -> bool:
+    """Whether a status means the resource exists (416: range past end of an empty body)."""
+    return status < 400 or status == 416
+
+def _request_headers(url: str, cache: Optional[LinkCache]) -> Dict[str, str]:
+    """Build request headers for a URL."""
     headers = {'User-Agent': USER_AGENT}
+    if cache is not None:
+        # Revalidate stale entries with If-None-Match/If-Modified-Since
+        headers.update(cache.conditional_headers(url))
+    
+    # Special handling for GitHub API URLs
+    if GITHUB_API_PATTERN.match(url):
+        headers['Accept'] = 'application/vnd.github.v3+json'
     
-    for attempt in range(retries):
+    return headers
+
+def _range_get(session: requests.Session, url: str, headers: Dict[str, str]) -> requests.Response:
+    """GET only the first byte of a URL and release the connection immediately."""
+    with session.get(url, headers={**headers, **RANGE_HEADER}, timeout=TIMEOUT,
+                     allow_redirects=True, stream=True) as response:
+        return response
+
+def probe_url(url: str, cache: Optional[LinkCache] = None,
+              breaker: Optional[CircuitBreaker] = None,
+              memo: Optional[LinkMemo] = None) -> Probe:
+    """Make a single check attempt for a URL."""
+    if memo is None:
+        memo = LinkMemo()
+    known = memo.known_result(url)
+    if known is not None:
+        return known
+    
+    host = _host(url)
+    if breaker is not None and breaker.is_open(host):
+        return Probe(url, False, breaker.down_message(host))
+    
+    started = time.monotonic()
+    probe = _probe_once(url, host, cache, memo)._replace(latency=time.monotonic() - started)
+    memo.remember_redirects(probe)
+    return probe
+
+def _probe_once(url: str, host: str, cache: Optional[LinkCache], memo: LinkMemo) -> Probe:
+    """Send the HEAD and/or range GET for one attempt."""
+    headers = _request_headers(url, cache)
+    session = _get_session()
+    
+    try:
+        if memo.head_support.get(host) is False:
+            response = _range_get(session, url, headers)
+        else:
+            response = session.head(url, headers=headers, timeout=TIMEOUT, allow_redirects=True)
+            
+            # If HEAD is rejected, try GET and learn whether the host rejects HEAD
+            if response.status_code in HEAD_REJECTED_STATUSES:
+                response = _range_get(session, url, headers)
+                if _is_ok(response.status_code):
+                    memo.head_support[host] = False
+            elif _is_ok(response.status_code):
+                memo.head_support[host] = True
+        
+        status = response.status_code
+        redirects = tuple(r.url for r in response.history)
+        if _is_ok(status):
+            return Probe(url, True, f"OK ({status})", status, response.headers,
+                         redirects=redirects, final_url=response.url)
+        else:
+            return Probe(url, False, f"HTTP {status}", status, response.headers,
+                         redirects=redirects, final_url=response.url)
+            
+    except requests.exceptions.RequestException as e:
+        if http_client.is_timeout(e):
+            return Probe(url, False, "Timeout", connection_failed=True)
+        if isinstance(e, requests.exceptions.ConnectionError):
+            return Probe(url, False, "Connection Error", connection_failed=True)
+        return Probe(url, False, f"Error: {str(e)}")
+        
+    except Exception as e:
+        return Probe(url, False, f"Error: {str(e)}")
+
+def check_url(url: str, cache: Optional[LinkCache] = None) -> Tuple[str, bool, str]:
+    """Check if a URL is accessible with a single attempt.
+    
+    check_all_links retries failed URLs through its delay queue.
+    """
+    return _record(cache, probe_url(url, cache))
+
+class HostSlot:
+    """Async context manager holding one per-host slot and one global in-flight slot."""
+    
+    def __init__(self, host_limit: asyncio.Semaphore, in_flight: asyncio.Semaphore):
+        self.host_limit = host_limit
+        self.in_flight = in_flight
+    
+    async def __aenter__(self):
+        # Take the host slot first so URLs queued behind a busy host
+        # don't tie up global capacity other hosts could use
+        await self.host_limit.acquire()
         try:
-            # Special handling for GitHub API URLs
-            if GITHUB_API_PATTERN.match(url):
-                headers['Accept'] = 'application/vnd.github.v3+json'
+            await self.in_flight.acquire()
+        except BaseException:
+            self.host_limit.release()
+            raise
+    
+    async def __aexit__(self, *exc_info):
+        self.in_flight.release()
+        self.host_limit.release()
+
+async def probe_url_async(session, url: str, slot: HostSlot,
+                          cache: Optional[LinkCache] = None,
+                          breaker: Optional[CircuitBreaker] = None,
+                          memo: Optional[LinkMemo] = None) -> Optional[Probe]:
+    """Make a single check attempt for a URL without blocking a worker thread.
+    
+    Returns None without sending a request if, by the time a slot is free, the
+    breaker has marked the host down or paused it.
+    """
+    if memo is None:
+        memo = LinkMemo()
+    headers = _request_headers(url, cache)
+    range_headers = {**headers, **RANGE_HEADER}
+    host = _host(url)
+    started = time.monotonic()
+    
+    try:
+        # Hold the slot only while a request is actually in flight
+        async with slot:
+            # The host may have gone down or been paused while this URL waited
+            if breaker is not None and (breaker.is_open(host) or breaker.wait_time(host) > 0):
+                return None
+            started = time.monotonic()
+            if memo.head_support.get(host) is False:
+                async with session.get(url, headers=range_headers, allow_redirects=True) as response:
+                    status = response.status
+                    response_headers = response.headers
+                    history = response.history
+            else:
+                async with session.head(url, headers=headers, allow_redirects=True) as response:
+                    status = response.status
+                    response_headers = response.headers
+                    history = response.history
+                
+                # If HEAD is rejected, try GET and learn whether the host rejects HEAD
+                if status in HEAD_REJECTED_STATUSES:
+                    async with session.get(url, headers=range_headers, allow_redirects=True) as response:
+                        status = response.status
+                        response_headers = response.headers
+                        history = response.history
+                    if _is_ok(status):
+                        memo.head_support[host] = False
+                elif _is_ok(status):
+                    memo.head_support[host] = True
+        
+        latency = time.monotonic() - started
+        redirects = tuple(str(r.url) for r in history)
+        if _is_ok(status):
+            return Probe(url, True, f"OK ({status})", status, response_headers, latency=latency,
+                         redirects=redirects, final_url=str(response.url))
+        else:
+            return Probe(url, False, f"HTTP {status}", status, response_headers, latency=latency,
+                         redirects=redirects, final_url=str(response.url))
             
-            response = requests.head(url, headers=headers, timeout=TIMEOUT, allow_redirects=True)
+    except asyncio.TimeoutError:
+        return Probe(url, False, "Timeout", connection_failed=True,
+                     latency=time.monotonic() - started)
+        
+    except aiohttp.ClientConnectionError:
+        return Probe(url, False, "Connection Error", connection_failed=True,
+                     latency=time.monotonic() - started)
+        
+    except Exception as e:
+        return Probe(url, False, f"Error: {str(e)}", latency=time.monotonic() - started)
+
+async def _probe_with_retries_async(session, url: str, slot: HostSlot, breaker: CircuitBreaker,
+                                    retries: int = RETRY_ATTEMPTS,
+                                    cache: Optional[LinkCache] = None,
+                                    memo: Optional[LinkMemo] = None) -> Probe:
+    """Probe a URL until it succeeds or retries run out, sleeping without holding a slot."""
+    host = _host(url)
+    if memo is None:
+        memo = LinkMemo()
+    
+    for attempt in range(1, retries + 1):
+        probe = None
+        while probe is None:
+            # Wait out a Retry-After/429 pause on this host
+            pause = breaker.wait_time(host)
+            if pause > 0:
+                await asyncio.sleep(pause)
             
-            # If HEAD request fails, try GET
-            if response.status_code >= 400:
-                response = requests.get(url, headers=headers, timeout=TIMEOUT, allow_redirects=True, stream=True)
+            known = memo.known_result(url)
+            if known is not None:
+                return known
             
-            if response.status_code < 400:
-                return url, True, f"OK ({response.status_code})"
+            if breaker.is_open(host):
+                return Probe(url, False, breaker.down_message(host))
+            
+            # None: the host went down or was paused while waiting for a slot
+            probe = await probe_url_async(session, url, slot, cache, breaker, memo)
+        breaker.record(host, probe)
+        memo.remember_redirects(probe)
+        
+        delay = retry_delay(probe, attempt) if is_retryable(probe) else None
+        if attempt == retries or delay is None:
+            return probe
+        
+        await asyncio.sleep(delay)
+    
+    return Probe(url, False, "Unknown Error")
+
+def _check_urls_threaded(unique_urls: List[str], cache: Optional[LinkCache] = None,
+                         on_result: Optional[Callable[[Probe], None]] = None,
+                         memo: Optional[LinkMemo] = None) -> Dict[str, Tuple[bool, str]]:
+    """Check URLs on a thread pool of MAX_WORKERS blocking workers.
+    
+    Failed attempts go back on a delay queue rather than sleeping in a worker,
+    so backoff and Retry-After pauses never hold a thread. on_result is called
+    with each URL's final probe as soon as it is known.
+    """
+    url_status = {}
+    attempts = defaultdict(int)
+    breaker = CircuitBreaker()
+    memo = memo if memo is not None else LinkMemo()
+    delayed = RetryQueue()
+    
+    def finish(probe: Probe) -> None:
+        url_status[probe.url] = _record(cache, probe)[1:]
+        if on_result is not None:
+            on_result(probe)
+        
+        # Progress indicator
+        if len(url_status) % 10 == 0:
+            print(f"Checked {len(url_status)}/{len(unique_urls)} unique URLs...")
+    
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        pending = {}
+        
+        def submit(url: str) -> None:
+            # Hosts paused by Retry-After/429 wait on the queue, not in a worker
+            pause = breaker.wait_time(_host(url))
+            if pause > 0:
+                delayed.push(url, pause)
             else:
-                return url, False, f"HTTP {response.status_code}"
-                
-        except requests.exceptions.Timeout:
-            if attempt == retries - 1:
-                return url, False, "Timeout"
+                pending[executor.submit(probe_url, url, cache, breaker, memo)] = url
+        
+        for url in unique_urls:
+            submit(url)
+        
+        while pending or delayed:
+            if pending:
+                done, _ = wait(pending, timeout=delayed.next_delay(), return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(delayed.next_delay())
+                done = set()
+            
+            for future in done:
+                url = pending.pop(future)
+                try:
+                    probe = future.result()
+                except Exception as e:
+                    finish(Probe(url, False, f"Check failed: {e}"))
+                    continue
                 
-        except requests.exceptions.ConnectionError:
-            if attempt == retries - 1:
-                return url, False, "Connection Error"
+                host = _host(url)
+                breaker.record(host, probe)
+                attempts[url] += 1
                 
+                delay = retry_delay(probe, attempts[url]) if is_retryable(probe) else None
+                if attempts[url] >= RETRY_ATTEMPTS or delay is None or breaker.is_open(host):
+                    finish(probe)
+                else:
+                    delayed.push(url, delay)
+            
+            for url in delayed.pop_due():
+                submit(url)
+    
+    return url_status
+
+async def _check_urls_async(unique_urls: List[str], max_in_flight: int, per_host: int,
+                            cache: Optional[LinkCache] = None,
+                            on_result: Optional[Callable[[Probe], None]] = None,
+                            memo: Optional[LinkMemo] = None) -> Dict[str, Tuple[bool, str]]:
+    """Check URLs concurrently on one event loop with per-host limits."""
+    url_status = {}
+    memo = memo if memo is not None else LinkMemo()
+    host_limits = defaultdict(lambda: asyncio.Semaphore(per_host))
+    in_flight = asyncio.Semaphore(max_in_flight)
+    breaker = CircuitBreaker()
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT)
+    # Concurrency is bounded by the semaphores above, not by the connector
+    connector = aiohttp.TCPConnector(limit=0, limit_per_host=0, ttl_dns_cache=http_client.DNS_TTL)
+    
+    async def bounded_check(session, url):
+        try:
+            slot = HostSlot(host_limits[_host(url)], in_flight)
+            return await _probe_with_retries_async(session, url, slot, breaker, RETRY_ATTEMPTS, cache, memo)
         except Exception as e:
-            if attempt == retries - 1:
-                return url, False, f"Error: {str(e)}"
+            return Probe(url, False, f"Check failed: {e}")
+    
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        tasks = [bounded_check(session, url) for url in unique_urls]
         
-        # Wait before retry
-        if attempt < retries - 1:
-            time.sleep(2 ** attempt)
+        for i, future in enumerate(asyncio.as_completed(tasks), 1):
+            probe = await future
+            url, is_valid, message = _record(cache, probe)
+            url_status[url] = (is_valid, message)
+            if on_result is not None:
+                on_result(probe)
+            
+            # Progress indicator
+            if i % 100 == 0:
+                print(f"Checked {i}/{len(unique_urls)} unique URLs...")
     
-    return url, False, "Unknown Error"
+    return url_status
 
-def check_all_links(base_path: Path) -> Dict[str, List[Tuple[str, str, int, bool, str]]]:
-    """Check all links in the repository."""
+def check_urls_async(unique_urls: List[str], max_in_flight: int = ASYNC_MAX_IN_FLIGHT,
+                     per_host: int = PER_HOST_LIMIT, cache: Optional[LinkCache] = None,
+                     on_result: Optional[Callable[[Probe], None]] = None,
+                     memo: Optional[LinkMemo] = None) -> Dict[str, Tuple[bool, str]]:
+    """Check URLs with the asyncio engine (requires aiohttp)."""
+    if aiohttp is None:
+        raise RuntimeError("aiohttp is required for async link checking: pip install aiohttp")
+    return asyncio.run(_check_urls_async(unique_urls, max_in_flight, per_host, cache, on_result, memo))
+
+def check_all_links(base_path: Path, use_async: bool = False,
+                    max_in_flight: int = ASYNC_MAX_IN_FLIGHT,
+                    per_host: int = PER_HOST_LIMIT,
+                    cache: Optional[LinkCache] = None,
+                    catalog: Optional[Catalog] = None,
+                    incremental: bool = False,
+                    since: Optional[str] = None,
+                    recheck_expired: bool = False,
+                    sink: Optional[ResultSink] = None,
+                    shard: Optional[Tuple[int, int]] = None) -> Dict[str, List[Tuple[str, str, int, bool, str]]]:
+    """Check all links in the repository.
+    
+    URLs come from the catalog (parsed here if not given). In incremental mode,
+    only URLs added since the catalog's cached parse (or since a git revision),
+    plus the catalog's recheck_urls, are checked; recheck_expired (with a cache) also includes
+    URLs whose cached result is missing or older than the cache TTL.
+    
+    With a sink, every occurrence is written as soon as its URL finishes and
+    nothing is accumulated; rebuild the results with load_results instead.
+    
+    With shard=(i, N), only URLs whose host hashes to shard i are checked.
+    """
     results = {}
     all_urls = []
+    added_urls = set()
     
-    # Find all markdown files
-    md_files = list(base_path.glob('**/*.md'))
+    if catalog is None:
+        catalog = Catalog(base_path)
     
-    print(f"Found {len(md_files)} markdown files to check")
+    print(f"Found {len(catalog.files)} markdown files to check")
     
-    # Extract URLs from all files
-    for file_path in md_files:
-        urls = extract_urls_from_file(file_path)
-        if urls:
-            results[str(file_path.relative_to(base_path))] = []
-            for url, text, line_num in urls:
-                all_urls.append((file_path, url, text, line_num))
+    for link in catalog.links:
+        # Skip shields.io badges (they're dynamically generated)
+        if SHIELD_IO_PATTERN.match(link.url):
+            continue
+        results.setdefault(link.file, [])
+        all_urls.append((base_path / link.file, link.url, link.text, link.line))
+    if incremental:
+        added_urls = set().union(*catalog.added_urls.values())
     
     print(f"Found {len(all_urls)} URLs to check")
     
-    # Check URLs concurrently
-    unique_urls = list(set(url for _, url, _, _ in all_urls))
+    # Incremental mode: restrict to new URLs (plus expired ones on request)
+    if incremental or since is not None:
+        targets = changed_urls_since(base_path, since) if since is not None else added_urls
+        # URLs that failed last time stay targets until they pass
+        targets |= catalog.recheck_urls
+        if recheck_expired and cache is not None:
+            for url in set(url for _, url, _, _ in all_urls):
+                entry = cache.get(url)
+                if not entry or not cache.is_fresh(entry):
+                    targets.add(url)
+        all_urls = [item for item in all_urls if item[1] in targets]
+        results = {rel_path: [] for rel_path in
+                   set(str(file_path.relative_to(base_path)) for file_path, _, _, _ in all_urls)}
+        print(f"Incremental mode: {len(all_urls)} URLs added or changed")
+    
+    if shard is not None:
+        shard_index, shard_count = shard
+        all_urls = [item for item in all_urls if shard_for_url(item[1], shard_count) == shard_index]
+        results = {rel_path: [] for rel_path in
+                   set(str(file_path.relative_to(base_path)) for file_path, _, _, _ in all_urls)}
+        print(f"Shard {shard_index}/{shard_count}: {len(all_urls)} URLs")
+    
+    # Check each resource once: http/https, host case, fragment and
+    # trailing-slash variants share one representative URL
+    variants = defaultdict(list)
+    for url in set(url for _, url, _, _ in all_urls):
+        variants[canonical_url(url)].append(url)
+    representatives = {key: _representative(urls) for key, urls in variants.items()}
+    unique_urls = list(representatives.values())
     url_status = {}
     
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_url = {executor.submit(check_url, url): url for url in unique_urls}
+    print(f"Checking {len(unique_urls)} distinct resources "
+          f"({sum(len(urls) for urls in variants.values())} unique URLs)")
+    
+    # Streaming output: occurrences are kept only until their resource is written
+    on_result = None
+    if sink is not None:
+        occurrences = defaultdict(list)
+        for file_path, url, text, line_num in all_urls:
+            occurrences[canonical_url(url)].append((str(file_path.relative_to(base_path)), url, text, line_num))
+        all_urls = []
+        results = {}
         
-        for i, future in enumerate(as_completed(future_to_url), 1):
-            url = future_to_url[future]
-            try:
-                _, is_valid, message = future.result()
-                url_status[url] = (is_valid, message)
-                
-                # Progress indicator
-                if i % 10 == 0:
-                    print(f"Checked {i}/{len(unique_urls)} unique URLs...")
-                    
-            except Exception as e:
-                url_status[url] = (False, f"Check failed: {e}")
+        def write_occurrences(probe: Probe) -> None:
+            for rel_path, url, text, line_num in occurrences.pop(canonical_url(probe.url), ()):
+                sink.write(rel_path, line_num, url, text, probe.is_valid,
+                           probe.message, probe.status, probe.latency)
+        on_result = write_occurrences
+    
+    # Memo state lives for this run only, seeded from the cache
+    remembered = {}
+    remembered_redirects = {}
+    if cache is not None:
+        remembered = cache.load_head_support()
+        remembered_redirects = cache.load_redirects()
+    memo = LinkMemo(remembered, remembered_redirects)
+    
+    # Skip URLs (or their known redirect targets) confirmed healthy within the cache TTL
+    if cache is not None:
+        to_check = []
+        for url in unique_urls:
+            entry = cache.lookup(url, alias=memo.redirects.get(canonical_url(url)))
+            if entry:
+                url_status[url] = (True, entry['message'])
+                if on_result is not None:
+                    on_result(Probe(url, True, entry['message'], entry['status']))
+            else:
+                to_check.append(url)
+        unique_urls = to_check
+    
+    if use_async:
+        url_status.update(check_urls_async(unique_urls, max_in_flight, per_host, cache, on_result, memo))
+    else:
+        url_status.update(_check_urls_threaded(unique_urls, cache, on_result, memo))
+    
+    # Map each resource's result back to every variant
+    for key, urls in variants.items():
+        status = url_status.get(representatives[key], (False, "Unknown"))
+        for url in urls:
+            url_status[url] = status
+    
+    if cache is not None:
+        # Only store what changed so remembered entries still age out
+        cache.save_head_support({host: head_ok for host, head_ok in memo.head_support.items()
+                                 if remembered.get(host) != head_ok})
+        cache.save_redirects({source: target for source, target in memo.redirects.items()
+                              if remembered_redirects.get(source) != target})
+        print(f"Cache: {cache.hits} hits, {cache.misses} misses "
+              f"({cache.revalidated} revalidated as unchanged)")
     
     # Compile results by file
     for file_path, url, text, line_num in all_urls:
@@ -177,14 +691,87 @@ def generate_report(results: Dict[str, List[Tuple[str, str, int, bool, str]]]) -
 
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Check links in markdown files.")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="use the asyncio engine instead of the thread pool (requires aiohttp)")
+    parser.add_argument('--max-in-flight', type=int, default=ASYNC_MAX_IN_FLIGHT,
+                        help=f"maximum concurrent requests in --async mode (default: {ASYNC_MAX_IN_FLIGHT})")
+    parser.add_argument('--per-host', type=int, default=PER_HOST_LIMIT,
+                        help=f"maximum concurrent requests per host in --async mode (default: {PER_HOST_LIMIT})")
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_PATH, metavar='PATH',
+                        help=f"persist results to a SQLite cache (default path: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL / 3600, metavar='HOURS',
+                        help="skip cached healthy links checked within this many hours (default: 24)")
+    parser.add_argument('--output', metavar='PATH',
+                        help="stream each result to a JSONL file (or SARIF for .sarif) as it finishes")
+    parser.add_argument('--report-from', metavar='PATH',
+                        help="skip checking and rebuild the report from an earlier --output stream")
+    parser.add_argument('--shard', type=parse_shard, metavar='I/N',
+                        help="only check URLs whose host hashes to shard I of N (1-based); "
+                             "results are streamed to a partial file")
+    parser.add_argument('--merge', nargs='+', metavar='PATH',
+                        help="skip checking and build the report from partial shard result files")
+    parser.add_argument('--incremental', nargs='?', const=DEFAULT_INDEX_PATH, metavar='PATH',
+                        help="only check URLs added since the last saved catalog snapshot "
+                             f"(default path: {DEFAULT_INDEX_PATH})")
+    parser.add_argument('--since', metavar='REV',
+                        help="only check URLs added since a git revision")
+    parser.add_argument('--recheck-expired', action='store_true',
+                        help="with --incremental or --since, also recheck URLs whose cached result "
+                             "expired (enables --cache)")
+    args = parser.parse_args()
+    if args.recheck_expired:
+        if not (args.incremental or args.since):
+            parser.error("--recheck-expired requires --incremental or --since")
+        # Expiry is read from the cache, so use the default one if none was given
+        args.cache = args.cache or DEFAULT_CACHE_PATH
+    
+    # Rebuild the report from a (possibly partial) earlier run or from shards
+    if args.report_from or args.merge:
+        if args.merge:
+            results = merge_results(Path(path) for path in args.merge)
+        else:
+            results = load_results(Path(args.report_from))
+        all_valid = generate_report(results)
+        sys.exit(0 if all_valid else 1)
+    
     # Determine repository root
     script_path = Path(__file__).resolve()
     repo_root = script_path.parent.parent
     
     print(f"Checking links in: {repo_root}")
     
+    # One kept-alive connection per worker for each host
+    http_client.configure(pool_maxsize=MAX_WORKERS)
+    cache = LinkCache(Path(args.cache), ttl=args.cache_ttl * 3600) if args.cache else None
+    catalog = Catalog(repo_root, Path(args.incremental or DEFAULT_CATALOG_PATH))
+    if args.shard and not args.output:
+        args.output = f"link_results.shard-{args.shard[0]}-of-{args.shard[1]}.jsonl"
+    sink = ResultSink(Path(args.output)) if args.output else None
+    
     # Check all links
-    results = check_all_links(repo_root)
+    try:
+        results = check_all_links(repo_root, use_async=args.use_async,
+                                  max_in_flight=args.max_in_flight, per_host=args.per_host,
+                                  cache=cache, catalog=catalog,
+                                  incremental=bool(args.incremental), since=args.since,
+                                  recheck_expired=args.recheck_expired, sink=sink,
+                                  shard=args.shard)
+    finally:
+        if sink is not None:
+            sink.close()
+    if cache is not None:
+        cache.close()
+    if sink is not None:
+        print(f"Streamed {sink.count} results to: {sink.path}")
+        results = load_results(sink.path)
+    
+    # Keep failing URLs in the snapshot's recheck list so the next --incremental
+    # run reports them again instead of treating them as already checked
+    checked = set(url for links in results.values() for url, _, _, _, _ in links)
+    failed = set(url for links in results.values() for url, _, _, valid, _ in links if not valid)
+    catalog.recheck_urls = (catalog.recheck_urls - checked) | failed
+    catalog.save()
     
     # Generate report
     all_valid = generate_report(results)
@@ -4,91 +4,98 @@ Citation counter for Awesome Variant Effect Predictors.
 Fetches citation counts from various sources for academic papers.
 """
 
-import re
 import json
+import queue
+import threading
 import time
-import requests
+import argparse
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
 from urllib.parse import quote
 
+import http_client
+from citation_store import CitationStore, DEFAULT_STORE_PATH, TREND_DAYS
+from badge_rewriter import BadgeRewriter
+from catalog import Catalog, DEFAULT_CATALOG_PATH, ENTRY_PATTERN, parse_markdown
+from doi_registry import DOIRegistry
+
 # Configuration
 SEMANTIC_SCHOLAR_API = "https://api.semanticscholar.org/v1/paper/{}"
+SEMANTIC_SCHOLAR_BATCH_API = "https://api.semanticscholar.org/graph/v1/paper/batch"
+SEMANTIC_SCHOLAR_BATCH_SIZE = 500  # paper IDs per batch request (API maximum)
 CROSSREF_API = "https://api.crossref.org/works/{}"
 USER_AGENT = "awesome-vep-citations/1.0"
+HEDGE_DELAY = 1.5  # seconds before the next source is asked as well
+RESOLVER_WORKERS = 8  # DOIs resolved concurrently after a batch lookup
+
+CITATION_BADGES = BadgeRewriter(ENTRY_PATTERN, ['Citations'])
 
-# Common VEP tools and their DOIs/identifiers
-KNOWN_TOOLS = {
-    'SIFT': {
-        'doi': '10.1093/nar/gkl423',
-        'title': 'Predicting the Effects of Coding Non-Synonymous Variants'
-    },
-    'PolyPhen-2': {
-        'doi': '10.1038/nmeth0410-248',
-        'title': 'A method and server for predicting damaging missense mutations'
-    },
-    'CADD': {
-        'doi': '10.1038/ng.2892',
-        'title': 'A general framework for estimating the relative pathogenicity'
-    },
-    'REVEL': {
-        'doi': '10.1016/j.ajhg.2016.08.016',
-        'title': 'An Ensemble Method for Predicting the Pathogenicity'
-    },
-    'AlphaMissense': {
-        'doi': '10.1126/science.adg7492',
-        'title': 'Accurate proteome-wide missense variant effect prediction'
-    },
-    'EVE': {
-        'doi': '10.1038/s41586-021-04043-8',
-        'title': 'Disease variant prediction with deep generative models'
-    },
-    'PrimateAI': {
-        'doi': '10.1038/s41588-018-0167-z',
-        'title': 'Using deep learning to identify pathogenic variants'
-    },
-    'SpliceAI': {
-        'doi': '10.1016/j.cell.2018.12.015',
-        'title': 'A deep learning approach to identify genetic variants'
-    },
-    'VEST': {
-        'doi': '10.1093/bioinformatics/btt685',
-        'title': 'VEST 3.0: a resource for the prioritization'
-    },
-    'MutationTaster': {
-        'doi': '10.1038/nmeth0810-575',
-        'title': 'MutationTaster evaluates disease-causing potential'
-    },
-    'PROVEAN': {
-        'doi': '10.1371/journal.pone.0046688',
-        'title': 'Predicting Functional Effect of Human Missense Mutations'
-    },
-    'FATHMM': {
-        'doi': '10.1093/bioinformatics/bts479',
-        'title': 'Predicting the functional, molecular, and phenotypic consequences'
-    }
-}
+def citation_badge(count: int) -> str:
+    """Shields.io badge for a citation count, rounded for large counts."""
+    if count >= 10000:
+        badge_text = f"{count//1000}K+"
+    elif count >= 1000:
+        badge_text = f"{count//100*100}+"
+    else:
+        badge_text = str(count)
+    return f"![Citations](https://img.shields.io/badge/citations-{badge_text}-brightgreen)"
+
+def semantic_scholar_id(paper_id: str) -> str:
+    """Semantic Scholar paper ID for a DOI or PMID:<id>."""
+    return paper_id if paper_id.startswith('PMID:') else f"DOI:{paper_id}"
 
 class CitationCounter:
-    def __init__(self):
-        """Initialize the citation counter."""
+    def __init__(self, store: Optional[CitationStore] = None,
+                 registry: Optional[DOIRegistry] = None):
+        """Initialize the citation counter, optionally backed by a persistent store."""
         self.headers = {'User-Agent': USER_AGENT}
+        self.registry = registry or DOIRegistry()
         self.citation_cache = {}
+        self.store = store
+        self.session = http_client.get_session()
+        # Sources in order of preference; later ones are started as hedges
+        self.sources = [
+            ("Semantic Scholar", self.get_semantic_scholar_citations),
+            ("Crossref", self.get_crossref_citations)
+        ]
+        self.source_wins = Counter()
+    
+    def _remember(self, doi: str, count: int, source: str) -> Tuple[int, str]:
+        """Cache a freshly fetched count for this run and in the store."""
+        self.citation_cache[doi] = (count, source)
+        if self.store is not None:
+            self.store.record(doi, count, source)
+        return count, source
+    
+    def _remember_miss(self, doi: str) -> Tuple[int, str]:
+        """Cache an unresolvable DOI for this run only, so it is not looked up again."""
+        self.citation_cache[doi] = (0, "Not found")
+        return self.citation_cache[doi]
+    
+    def _cached(self, doi: str) -> Optional[Tuple[int, str]]:
+        """Count (or miss) from this run or, while within its source's TTL, from the store."""
+        if doi not in self.citation_cache and self.store is not None:
+            stored = self.store.get(doi)
+            if stored:
+                self.citation_cache[doi] = stored
+        return self.citation_cache.get(doi)
         
     def get_semantic_scholar_citations(self, doi: str) -> Optional[int]:
         """Get citation count from Semantic Scholar."""
         try:
             # Try DOI first
             url = SEMANTIC_SCHOLAR_API.format(doi)
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.session.get(url, headers=self.headers, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
                 return data.get('citationCount', 0)
             elif response.status_code == 404:
                 # Try with DOI prefix
-                url = SEMANTIC_SCHOLAR_API.format(f"DOI:{doi}")
-                response = requests.get(url, headers=self.headers, timeout=10)
+                url = SEMANTIC_SCHOLAR_API.format(semantic_scholar_id(doi))
+                response = self.session.get(url, headers=self.headers, timeout=10)
                 if response.status_code == 200:
                     data = response.json()
                     return data.get('citationCount', 0)
@@ -97,18 +104,107 @@ class CitationCounter:
         
         return None
     
+    def get_semantic_scholar_citations_batch(self, dois: List[str]) -> Dict[str, int]:
+        """Get citation counts for many DOIs with the Semantic Scholar paper batch endpoint.
+        
+        DOIs the service does not know are left out of the result.
+        """
+        counts = {}
+        for start in range(0, len(dois), SEMANTIC_SCHOLAR_BATCH_SIZE):
+            batch = dois[start:start + SEMANTIC_SCHOLAR_BATCH_SIZE]
+            try:
+                response = self.session.post(
+                    SEMANTIC_SCHOLAR_BATCH_API, headers=self.headers, timeout=30,
+                    params={'fields': 'citationCount'},
+                    json={'ids': [semantic_scholar_id(doi) for doi in batch]}
+                )
+                if response.status_code != 200:
+                    print(f"Semantic Scholar batch lookup failed: HTTP {response.status_code}")
+                    continue
+                # One result per requested ID, in order; null for unknown papers
+                for doi, paper in zip(batch, response.json()):
+                    if paper and paper.get('citationCount') is not None:
+                        counts[doi] = paper['citationCount']
+            except Exception as e:
+                print(f"Error in Semantic Scholar batch lookup: {e}")
+        
+        return counts
+    
+    def prefetch_citations(self, dois: Iterable[str]) -> None:
+        """Resolve uncached DOIs in bulk so get_citation_count is answered from the cache.
+        
+        DOIs the batch lookup misses are resolved through the per-DOI sources; DOIs no
+        source knows are cached as not found for the rest of the run.
+        """
+        pending = sorted(set(doi for doi in dois if doi and not self._cached(doi)))
+        if not pending:
+            return
+        counts = self.get_semantic_scholar_citations_batch(pending)
+        for doi, count in counts.items():
+            self._remember(doi, count, "Semantic Scholar")
+        print(f"Resolved {len(counts)}/{len(pending)} DOIs with Semantic Scholar batch lookups")
+        
+        # Resolve the rest concurrently; Semantic Scholar has just missed them
+        missing = [doi for doi in pending if doi not in counts]
+        fallbacks = [source for source in self.sources if source[0] != "Semantic Scholar"]
+        with ThreadPoolExecutor(max_workers=RESOLVER_WORKERS) as executor:
+            resolved_all = executor.map(self._resolve, missing, [fallbacks] * len(missing))
+            for doi, resolved in zip(missing, resolved_all):
+                if resolved:
+                    self._remember(doi, *resolved)
+                else:
+                    self._remember_miss(doi)
+    
+    def _resolve(self, doi: str,
+                 sources: Optional[List[Tuple]] = None) -> Optional[Tuple[int, str]]:
+        """Ask the sources (default: all) for a DOI, hedging: each next source starts after
+        HEDGE_DELAY or as soon as the previous ones have failed. The first count returned
+        wins and slower requests are abandoned."""
+        sources = self.sources if sources is None else sources
+        answers = queue.Queue()
+        
+        def ask(name, fetch):
+            try:
+                answers.put((name, fetch(doi)))
+            except Exception:
+                answers.put((name, None))
+        
+        started = 0
+        pending = 0
+        hedge_at = 0.0
+        while True:
+            if started < len(sources) and (not pending or time.monotonic() >= hedge_at):
+                # Daemon threads: an abandoned request never delays interpreter exit
+                threading.Thread(target=ask, args=sources[started], daemon=True).start()
+                started += 1
+                pending += 1
+                hedge_at = time.monotonic() + HEDGE_DELAY
+            if not pending:
+                return None
+            
+            timeout = max(0.0, hedge_at - time.monotonic()) if started < len(sources) else None
+            try:
+                name, count = answers.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            pending -= 1
+            if count is not None:
+                self.source_wins[name] += 1
+                return count, name
+    
     def get_crossref_citations(self, doi: str) -> Optional[int]:
         """Get citation count from Crossref."""
+        if doi.startswith('PMID:'):
+            return None  # Crossref only knows DOIs
         try:
             url = CROSSREF_API.format(doi)
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.session.get(url, headers=self.headers, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
-                # Crossref doesn't provide direct citation counts
-                # but we can get the reference count
-                refs = data.get('message', {}).get('reference-count', 0)
-                return refs
+                # Times the work is cited by other Crossref-registered works
+                # (reference-count is the length of its own reference list)
+                return data.get('message', {}).get('is-referenced-by-count')
         except Exception as e:
             print(f"Error fetching from Crossref for {doi}: {e}")
         
@@ -122,31 +218,24 @@ class CitationCounter:
     
     def get_citation_count(self, tool_name: str, doi: Optional[str] = None) -> Tuple[int, str]:
         """Get citation count for a tool."""
-        # Check cache first
-        cache_key = doi or tool_name
-        if cache_key in self.citation_cache:
-            return self.citation_cache[cache_key]
-        
         # Get DOI if not provided
-        if not doi and tool_name in KNOWN_TOOLS:
-            doi = KNOWN_TOOLS[tool_name]['doi']
+        if not doi:
+            doi = self.registry.paper_id(tool_name)
         
         if not doi:
             return 0, "No DOI"
         
-        # Try Semantic Scholar first
-        count = self.get_semantic_scholar_citations(doi)
-        if count is not None:
-            self.citation_cache[cache_key] = (count, "Semantic Scholar")
-            return count, "Semantic Scholar"
+        # Check cache first (filled in bulk by prefetch_citations)
+        cached = self._cached(doi)
+        if cached:
+            return cached
         
-        # Try Crossref as backup
-        count = self.get_crossref_citations(doi)
-        if count is not None:
-            self.citation_cache[cache_key] = (count, "Crossref")
-            return count, "Crossref"
+        # Semantic Scholar first, with Crossref hedged after a short delay
+        resolved = self._resolve(doi)
+        if resolved:
+            return self._remember(doi, *resolved)
         
-        return 0, "Not found"
+        return self._remember_miss(doi)
     
     def update_citation_badges(self, file_path: Path) -> bool:
         """Update citation badges in markdown file."""
@@ -154,38 +243,24 @@ class CitationCounter:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            updated = False
+            # Resolve the DOIs of every listed tool in bulk before rewriting
+            _, entries = parse_markdown(content)
+            self.prefetch_citations(self.registry.paper_id(entry.name) for entry in entries)
             
-            # Find tool entries and update citation badges
-            for tool_name, tool_info in KNOWN_TOOLS.items():
-                # Search for the tool in the content
-                pattern = re.compile(rf'\*\*\[{tool_name}\].*?\*\*[^\n]*', re.IGNORECASE)
-                
-                matches = pattern.findall(content)
-                if matches:
-                    count, source = self.get_citation_count(tool_name, tool_info['doi'])
-                    
-                    if count > 0:
-                        # Create citation badge
-                        if count >= 10000:
-                            badge_text = f"{count//1000}K+"
-                        elif count >= 1000:
-                            badge_text = f"{count//100*100}+"
-                        else:
-                            badge_text = str(count)
-                        
-                        citation_badge = f"![Citations](https://img.shields.io/badge/citations-{badge_text}-brightgreen)"
-                        
-                        # Update each match
-                        for match in matches:
-                            # Remove existing citation badge if present
-                            clean_match = re.sub(r'!\[Citations\]\([^)]+\)', '', match)
-                            # Add new badge
-                            new_match = f"{clean_match.rstrip()} {citation_badge}"
-                            content = content.replace(match, new_match)
-                            updated = True
-                            
-                            print(f"Updated {tool_name}: {count} citations from {source}")
+            def badges_for(link_text: str) -> Optional[List[str]]:
+                doi = self.registry.paper_id(link_text)
+                if not doi:
+                    return None
+                tool_name = link_text
+                count, source = self.get_citation_count(tool_name, doi)
+                if count <= 0:
+                    return None
+                print(f"Updated {tool_name}: {count} citations from {source}")
+                return [citation_badge(count)]
+            
+            new_content, count = CITATION_BADGES.rewrite(content, badges_for)
+            updated = count > 0 and new_content != content
+            content = new_content
             
             if updated:
                 with open(file_path, 'w', encoding='utf-8') as f:
@@ -204,8 +279,10 @@ class CitationCounter:
         print(f"{'='*60}\n")
         
         # Collect all citations
+        tools = self.registry.tools
+        self.prefetch_citations(self.registry.paper_id(name) for name in tools)
         citations = []
-        for tool_name in KNOWN_TOOLS:
+        for tool_name in tools:
             count, source = self.get_citation_count(tool_name)
             if count > 0:
                 citations.append((tool_name, count, source))
@@ -213,18 +290,27 @@ class CitationCounter:
         # Sort by citation count
         citations.sort(key=lambda x: x[1], reverse=True)
         
+        # Change over the trend window, from stored history
+        trends = {}
+        if self.store is not None:
+            for tool, _, _ in citations:
+                trends[tool] = self.store.trend(self.registry.paper_id(tool))
+        
         print("Top Tools by Citations:")
-        print(f"{'Tool':<20} {'Citations':>10} {'Source':<20}")
-        print("-" * 50)
+        print(f"{'Tool':<20} {'Citations':>10} {'Source':<20} {f'{TREND_DAYS}d change':>12}")
+        print("-" * 65)
         for tool, count, source in citations:
-            print(f"{tool:<20} {count:>10,} {source:<20}")
+            trend = trends.get(tool)
+            trend_text = f"{trend:+,}" if trend is not None else '-'
+            print(f"{tool:<20} {count:>10,} {source:<20} {trend_text:>12}")
         
         # Save to JSON
         citation_data = {
             tool: {
                 'citations': count,
                 'source': source,
-                'doi': KNOWN_TOOLS.get(tool, {}).get('doi', '')
+                'doi': self.registry.paper_id(tool) or '',
+                'trend': trends.get(tool)
             }
             for tool, count, source in citations
         }
@@ -233,17 +319,38 @@ class CitationCounter:
             json.dump(citation_data, f, indent=2)
         
         print(f"\nDetailed citation data saved to: citation_counts.json")
+        
+        if self.source_wins:
+            wins = ', '.join(f"{name}: {count}" for name, count in self.source_wins.most_common())
+            print(f"Per-DOI lookups answered by: {wins}")
 
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Count citations for catalog tools.")
+    parser.add_argument('--store', nargs='?', const=DEFAULT_STORE_PATH, metavar='PATH',
+                        help="keep counts and their history in a SQLite store and only refresh stale ones "
+                             f"(default path: {DEFAULT_STORE_PATH})")
+    args = parser.parse_args()
+    
     # Initialize citation counter
-    counter = CitationCounter()
+    store = CitationStore(Path(args.store)) if args.store else None
+    counter = CitationCounter(store=store)
     
     # Find repository root
     script_path = Path(__file__).resolve()
     repo_root = script_path.parent.parent
     
-    print("Fetching citation counts for known VEP tools...")
+    catalog = Catalog(repo_root, Path(DEFAULT_CATALOG_PATH))
+    catalog.save()
+    
+    # Pick up DOIs and PubMed IDs linked from new catalog entries
+    registry = counter.registry
+    discovered = registry.discover(catalog)
+    if discovered:
+        registry.save()
+        print(f"Added {discovered} tools to the DOI registry from catalog links")
+    listed = [name for name in registry.tools if catalog.find(name)]
+    print(f"Fetching citation counts for registered VEP tools ({len(listed)} listed in the catalog)...")
     
     # Update README with citation badges
     readme_path = repo_root / 'README.md'
@@ -253,6 +360,10 @@ def main():
     
     # Generate report
     counter.generate_citation_report()
+    
+    if store is not None:
+        print(f"Citation store: {store.hits} served locally, {store.refreshed} refreshed")
+        store.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
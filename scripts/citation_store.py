@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Persistent citation count store for the citation counter.
+Keeps the latest count per DOI in SQLite with per-source TTLs, so runs only
+refresh stale or missing DOIs, and keeps every fetched count so citation
+trends can be reported without re-fetching.
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlite_store import SQLiteStore
+
+# Configuration
+DEFAULT_STORE_PATH = '.citation_store.sqlite'
+DAY = 24 * 60 * 60
+SOURCE_TTLS = {  # seconds a count from each source is served without refetching
+    'Semantic Scholar': 7 * DAY,
+    'Crossref': 30 * DAY
+}
+DEFAULT_SOURCE_TTL = 7 * DAY
+TREND_DAYS = 90
+
+class CitationStore(SQLiteStore):
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS citations (
+            doi TEXT PRIMARY KEY,
+            count INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS history (
+            doi TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS history_doi ON history (doi, fetched_at)",
+    ]
+
+    def __init__(self, path: Path = Path(DEFAULT_STORE_PATH),
+                 ttls: Optional[Dict[str, float]] = None):
+        """Open (or create) the citation store at path."""
+        super().__init__(path)
+        self.ttls = dict(SOURCE_TTLS, **(ttls or {}))
+        self.hits = 0
+        self.refreshed = 0
+
+    def get(self, doi: str) -> Optional[Tuple[int, str]]:
+        """Return (count, source) for a DOI if it is within its source's TTL."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT count, source, fetched_at FROM citations WHERE doi = ?",
+                (doi.lower(),)
+            ).fetchone()
+        if row is None:
+            return None
+        count, source, fetched_at = row
+        if time.time() - fetched_at >= self.ttls.get(source, DEFAULT_SOURCE_TTL):
+            return None
+        self.hits += 1
+        return count, source
+
+    def record(self, doi: str, count: int, source: str) -> None:
+        """Store a freshly fetched count and add it to the DOI's history."""
+        now = time.time()
+        self.refreshed += 1
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO citations (doi, count, source, fetched_at) VALUES (?, ?, ?, ?)",
+                (doi.lower(), count, source, now)
+            )
+            self._conn.execute(
+                "INSERT INTO history (doi, count, source, fetched_at) VALUES (?, ?, ?, ?)",
+                (doi.lower(), count, source, now)
+            )
+            self._conn.commit()
+
+    def history(self, doi: str, days: float = TREND_DAYS) -> List[Tuple[float, int, str]]:
+        """Return (fetched_at, count, source) for a DOI over the last days, oldest first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT fetched_at, count, source FROM history WHERE doi = ? AND fetched_at > ? "
+                "ORDER BY fetched_at",
+                (doi.lower(), time.time() - days * DAY)
+            ).fetchall()
+
+    def trend(self, doi: str, days: float = TREND_DAYS) -> Optional[int]:
+        """Change in citation count over the last days, or None without enough history."""
+        points = self.history(doi, days)
+        if not points:
+            return None
+        # Sources count differently; only compare counts from the latest source
+        points = [point for point in points if point[2] == points[-1][2]]
+        if len(points) < 2:
+            return None
+        return points[-1][1] - points[0][1]
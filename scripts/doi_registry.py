@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+DOI registry for the citation counter.
+Maps tool names to the DOI (or PubMed ID) of their publication. The registry
+is a JSON data file that grows automatically from DOI and PubMed links found
+on catalog entries, is indexed by tool name and DOI, and is only read from
+disk when first used.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Configuration
+DEFAULT_REGISTRY_PATH = Path(__file__).resolve().parent / 'doi_registry.json'
+REGISTRY_VERSION = 1
+
+# Patterns
+DOI_PATTERN = re.compile(r'(?:https?://(?:dx\.)?doi\.org/|\bdoi:\s*)(10\.\d{4,9}/[^\s)\]>]+)', re.IGNORECASE)
+PUBMED_PATTERN = re.compile(
+    r'https?://(?:www\.)?(?:pubmed\.ncbi\.nlm\.nih\.gov|ncbi\.nlm\.nih\.gov/pubmed)/(\d+)', re.IGNORECASE
+)
+
+def paper_id(record: Dict) -> Optional[str]:
+    """Identifier used for citation lookups: the DOI, else 'PMID:<id>'."""
+    if record.get('doi'):
+        return record['doi']
+    if record.get('pmid'):
+        return f"PMID:{record['pmid']}"
+    return None
+
+class DOIRegistry:
+    def __init__(self, path: Path = DEFAULT_REGISTRY_PATH):
+        """Registry backed by the JSON file at path (read on first use)."""
+        self.path = Path(path)
+        self.changed = False
+        self._tools = None
+        self._by_name = None
+        self._by_doi = None
+
+    def _load(self) -> None:
+        if self._tools is not None:
+            return
+        self._tools = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == REGISTRY_VERSION:
+                    self._tools = data.get('tools', {})
+            except Exception as e:
+                print(f"Ignoring unreadable DOI registry {self.path}: {e}")
+        self._by_name = {name.lower(): name for name in self._tools}
+        self._by_doi = {}
+        for name, record in self._tools.items():
+            self._index(name, record)
+
+    def _index(self, name: str, record: Dict) -> None:
+        self._by_name[name.lower()] = name
+        identifier = paper_id(record)
+        if identifier:
+            self._by_doi.setdefault(identifier.lower(), []).append(name)
+
+    @property
+    def tools(self) -> Dict[str, Dict]:
+        """All registered tools: {name: {'doi' or 'pmid', 'title', ...}}."""
+        self._load()
+        return self._tools
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Record for a tool name (case-insensitive)."""
+        self._load()
+        key = self._by_name.get(name.lower())
+        return self._tools[key] if key else None
+
+    def paper_id(self, name: str) -> Optional[str]:
+        """DOI (or PMID:<id>) for a tool name, if registered."""
+        record = self.get(name)
+        return paper_id(record) if record else None
+
+    def tools_for(self, identifier: str) -> List[str]:
+        """Tool names registered under a DOI or PMID:<id>."""
+        self._load()
+        return self._by_doi.get(identifier.lower(), [])
+
+    def add(self, name: str, record: Dict) -> bool:
+        """Register a tool unless it is already known. Returns whether it was added."""
+        self._load()
+        if name.lower() in self._by_name:
+            return False
+        self._tools[name] = record
+        self._index(name, record)
+        self.changed = True
+        return True
+
+    def discover(self, catalog) -> int:
+        """Register catalog entries that link a DOI or PubMed record on their line."""
+        lines = {}
+        for link in catalog.links:
+            lines.setdefault((link.file, link.line), []).append(link.url)
+
+        added = 0
+        for entry in catalog.entries:
+            text = ' '.join([entry.url, entry.description] + lines.get((entry.file, entry.line), []))
+            doi = DOI_PATTERN.search(text)
+            pmid = PUBMED_PATTERN.search(text)
+            if doi:
+                record = {'doi': doi.group(1).rstrip('.,;')}
+            elif pmid:
+                record = {'pmid': pmid.group(1)}
+            else:
+                continue
+            record['discovered_in'] = f"{entry.file}:{entry.line}"
+            if self.add(entry.name, record):
+                added += 1
+        return added
+
+    def save(self) -> None:
+        """Write the registry back if it changed."""
+        if not self.changed:
+            return
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': REGISTRY_VERSION, 'tools': self.tools}, f, indent=2)
+            f.write('\n')
+        self.changed = False
@@ -4,44 +4,188 @@ GitHub statistics collector for Awesome Variant Effect Predictors.
 Fetches stars, forks, last commit dates, and other metrics for GitHub repositories.
 """
 
-import re
 import json
-import time
-import requests
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Tuple, Optional
-import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Tuple, Optional
+import argparse
+
+import http_client
+from badge_rewriter import BadgeRewriter, LINK_URL_PATTERN
+from catalog import Catalog, DEFAULT_CATALOG_PATH, github_repo, parse_markdown
+from api_cache import ApiCache, DEFAULT_API_CACHE_PATH, DEFAULT_MAX_AGE
+from retry_scheduler import parse_retry_after
+from token_pool import TokenPool, tokens_from_env
 
 # Configuration
 GITHUB_API_URL = "https://api.github.com/repos/{owner}/{repo}"
 RATE_LIMIT_URL = "https://api.github.com/rate_limit"
+GRAPHQL_API_URL = "https://api.github.com/graphql"
+GRAPHQL_BATCH_SIZE = 100  # repositories per query
 USER_AGENT = "awesome-vep-stats/1.0"
+MAX_WORKERS = 8  # concurrent API requests while the rate-limit budget allows
+RATE_LIMIT_RETRIES = 3  # times a rate-limited request is retried after waiting
+DEFAULT_JOURNAL_PATH = '.github_stats.journal.jsonl'
+
+GITHUB_BADGES = BadgeRewriter(LINK_URL_PATTERN, ['GitHub stars', 'Last commit'])
+
+# Fields requested for each repository in a batched GraphQL query
+GRAPHQL_REPO_FIELDS = """
+    stargazerCount
+    forkCount
+    issues(states: OPEN) { totalCount }
+    pullRequests(states: OPEN) { totalCount }
+    createdAt
+    updatedAt
+    primaryLanguage { name }
+    licenseInfo { spdxId }
+    description
+    isArchived
+    repositoryTopics(first: 100) { nodes { topic { name } } }
+    defaultBranchRef { target { ... on Commit { committedDate } } }
+"""
 
-# Patterns
-GITHUB_URL_PATTERN = re.compile(r'https://github\.com/([^/]+)/([^/\s]+)')
+class StatsJournal:
+    def __init__(self, path: Path = Path(DEFAULT_JOURNAL_PATH)):
+        """Checkpoint journal: one JSON line per repository whose stats were fetched."""
+        self.path = Path(path)
+        self._file = None
+    
+    def load(self) -> Dict[str, Dict]:
+        """Return the stats recorded by an earlier, interrupted run."""
+        done = {}
+        if not self.path.exists():
+            return done
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # partial last line of an interrupted run
+                done[record['repo']] = record['stats']
+        return done
+    
+    def open(self, resume: bool = False) -> None:
+        """Start a journal, or keep appending to the existing one when resuming."""
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        if resume and self._file.tell() > 0:
+            self._file.write('\n')  # terminate a partial last line before appending
+    
+    def write(self, repo_key: str, stats: Dict) -> None:
+        """Record a finished repository. Failures are left out so a resume retries them."""
+        if stats:
+            self._file.write(json.dumps({'repo': repo_key, 'stats': stats}) + '\n')
+            self._file.flush()
+    
+    def close(self, finished: bool = False) -> None:
+        """Close the journal, deleting it once the run's outputs have been written."""
+        if self._file:
+            self._file.close()
+            self._file = None
+        if finished and self.path.exists():
+            self.path.unlink()
 
 class GitHubStats:
-    def __init__(self, token: Optional[str] = None):
-        """Initialize with optional GitHub token for higher rate limits."""
-        self.token = token or os.environ.get('GITHUB_TOKEN')
+    def __init__(self, token: Optional[str] = None, cache: Optional[ApiCache] = None,
+                 tokens: Optional[List[str]] = None):
+        """Initialize with optional GitHub token(s) for higher rate limits and response cache.
+        
+        Without arguments, tokens are read from GITHUB_TOKENS and GITHUB_TOKEN.
+        """
+        if tokens is None:
+            tokens = [token] if token else tokens_from_env()
+        self.pool = TokenPool(tokens)
+        self.token = self.pool.tokens[0]
         self.headers = {'User-Agent': USER_AGENT}
-        if self.token:
-            self.headers['Authorization'] = f'token {self.token}'
         self.stats_cache = {}
+        self.cache = cache
+        self.session = http_client.get_session()
+    
+    def _headers_for(self, token: Optional[str]) -> Dict[str, str]:
+        headers = dict(self.headers)
+        if token:
+            headers['Authorization'] = f'token {token}'
+        return headers
         
     def check_rate_limit(self) -> Tuple[int, int]:
-        """Check GitHub API rate limit."""
-        try:
-            response = requests.get(RATE_LIMIT_URL, headers=self.headers)
-            if response.status_code == 200:
-                data = response.json()
-                remaining = data['rate']['remaining']
-                reset_time = data['rate']['reset']
-                return remaining, reset_time
-        except:
-            pass
-        return -1, -1
+        """Check GitHub API rate limit, summed over all tokens (earliest reset)."""
+        total, first_reset = -1, -1
+        for token in self.pool.tokens:
+            try:
+                response = self.session.get(RATE_LIMIT_URL, headers=self._headers_for(token))
+                if response.status_code == 200:
+                    data = response.json()
+                    remaining = data['rate']['remaining']
+                    reset_time = data['rate']['reset']
+                    # Seed the budgets; this endpoint does not count against them
+                    for resource, limits in data.get('resources', {}).items():
+                        if resource in self.pool.budgets[token]:
+                            self.pool.update(token, resource, limits['remaining'], limits['reset'])
+                    total = max(total, 0) + remaining
+                    first_reset = reset_time if first_reset < 0 else min(first_reset, reset_time)
+            except:
+                pass
+        return total, first_reset
+    
+    def _request(self, method: str, url: str, **kwargs):
+        """Send an API request through the token with the most rate-limit budget left.
+        
+        Requests rejected by a rate limit move to another token, or wait for the
+        reset or Retry-After when every token is spent.
+        """
+        resource = 'graphql' if url == GRAPHQL_API_URL else 'core'
+        extra_headers = kwargs.pop('headers', {})
+        attempts = RATE_LIMIT_RETRIES + len(self.pool.tokens)
+        for attempt in range(attempts):
+            token = self.pool.acquire(resource)
+            remaining = reset = None
+            try:
+                response = self.session.request(method, url, headers={**self._headers_for(token), **extra_headers},
+                                                **kwargs)
+                remaining = response.headers.get('X-RateLimit-Remaining')
+                reset = response.headers.get('X-RateLimit-Reset')
+            finally:
+                self.pool.release(token, resource,
+                                  int(remaining) if remaining is not None else None,
+                                  float(reset) if reset is not None else None)
+            
+            if response.status_code not in (403, 429) or attempt == attempts - 1:
+                return response
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                self.pool.pause(token, resource, retry_after)
+            elif remaining != '0':
+                return response  # forbidden for another reason
+        return response
+    
+    def _get_json(self, url: str, params: Optional[Dict] = None) -> Tuple[int, object]:
+        """GET a REST endpoint through the response cache, returning (status, data).
+        
+        Fresh entries are served without a request; stale ones are revalidated
+        with their ETag and a 304 is answered from the cache.
+        """
+        if self.cache is None:
+            response = self._request('GET', url, params=params, timeout=10)
+            return response.status_code, response.json() if response.status_code == 200 else None
+        
+        key = url + ('?' + '&'.join(f"{k}={v}" for k, v in sorted(params.items())) if params else '')
+        body = self.cache.lookup(key)
+        if body is not None:
+            return 200, body
+        
+        entry = self.cache.get(key)
+        response = self._request('GET', url, params=params, timeout=10,
+                                 headers=self.cache.conditional_headers(entry))
+        if response.status_code == 304 and entry:
+            self.cache.touch(key)
+            return 200, entry['body']
+        if response.status_code == 200:
+            data = response.json()
+            self.cache.store(key, data, response.headers.get('ETag'),
+                             response.headers.get('Last-Modified'))
+            return 200, data
+        return response.status_code, None
     
     def fetch_repo_stats(self, owner: str, repo: str) -> Dict:
         """Fetch statistics for a GitHub repository."""
@@ -53,10 +197,9 @@ class GitHubStats:
         url = GITHUB_API_URL.format(owner=owner, repo=repo.rstrip('/'))
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            status, data = self._get_json(url)
             
-            if response.status_code == 200:
-                data = response.json()
+            if status == 200:
                 stats = {
                     'stars': data.get('stargazers_count', 0),
                     'forks': data.get('forks_count', 0),
@@ -73,9 +216,9 @@ class GitHubStats:
                 }
                 self.stats_cache[cache_key] = stats
                 return stats
-            elif response.status_code == 404:
+            elif status == 404:
                 print(f"Repository not found: {owner}/{repo}")
-            elif response.status_code == 403:
+            elif status == 403:
                 remaining, reset_time = self.check_rate_limit()
                 if remaining == 0:
                     reset_dt = datetime.fromtimestamp(reset_time)
@@ -83,21 +226,148 @@ class GitHubStats:
                 else:
                     print(f"Access forbidden for {owner}/{repo}")
             else:
-                print(f"Error fetching {owner}/{repo}: HTTP {response.status_code}")
+                print(f"Error fetching {owner}/{repo}: HTTP {status}")
                 
         except Exception as e:
             print(f"Error fetching stats for {owner}/{repo}: {e}")
         
         return {}
     
+    def fetch_repo_stats_batch(self, repos: Dict[str, Tuple[str, str]],
+                               on_result: Optional[Callable[[str, Dict], None]] = None) -> Dict[str, Dict]:
+        """Fetch statistics for many repositories with one GraphQL query per batch.
+        
+        Requires a token. Returns the same per-repository dicts as fetch_repo_stats;
+        repositories whose batch request failed are fetched over REST instead.
+        on_result is called with each repository's stats as its batch finishes.
+        """
+        results = {}
+        pending = []
+        for repo_key, (owner, repo) in repos.items():
+            cached = self.cache.lookup(f"graphql:{repo_key}") if self.cache else None
+            if repo_key in self.stats_cache:
+                results[repo_key] = self.stats_cache[repo_key]
+            elif cached:
+                # GraphQL has no conditional requests; max_age alone decides
+                results[repo_key] = self.stats_cache[repo_key] = cached
+            else:
+                pending.append((repo_key, owner, repo.rstrip('/')))
+                continue
+            if on_result:
+                on_result(repo_key, results[repo_key])
+        
+        batches = [pending[start:start + GRAPHQL_BATCH_SIZE]
+                   for start in range(0, len(pending), GRAPHQL_BATCH_SIZE)]
+        
+        def fetch_batch(batch):
+            batch_stats = self._query_repo_batch(batch)
+            if batch_stats is None:
+                # Whole query failed: fall back to one REST call per repository
+                return {repo_key: self.fetch_repo_stats(owner, repo) for repo_key, owner, repo in batch}
+            return batch_stats
+        
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = [executor.submit(fetch_batch, batch) for batch in batches]
+            done = 0
+            for future in as_completed(futures):
+                for repo_key, stats in future.result().items():
+                    if stats:
+                        self.stats_cache[repo_key] = stats
+                        if self.cache:
+                            self.cache.store(f"graphql:{repo_key}", stats)
+                    results[repo_key] = stats
+                    if on_result:
+                        on_result(repo_key, stats)
+                done += 1
+                print(f"Fetched batch {done}/{len(batches)}")
+        
+        return results
+    
+    def fetch_all_stats(self, repos: Dict[str, Tuple[str, str]],
+                        on_result: Optional[Callable[[str, Dict], None]] = None) -> Dict[str, Dict]:
+        """Fetch statistics for every repository as fast as the rate-limit budget allows.
+        
+        Uses batched GraphQL with a token, and concurrent REST calls without one.
+        on_result is called with each repository's stats as soon as they arrive.
+        """
+        if self.token:
+            return self.fetch_repo_stats_batch(repos, on_result)
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {executor.submit(self.fetch_repo_stats, owner, repo): repo_key
+                       for repo_key, (owner, repo) in repos.items()}
+            for i, future in enumerate(as_completed(futures), 1):
+                repo_key = futures[future]
+                results[repo_key] = future.result()
+                if on_result:
+                    on_result(repo_key, results[repo_key])
+                print(f"Fetched stats for {repo_key} ({i}/{len(repos)})")
+        return results
+    
+    def _query_repo_batch(self, batch: List[Tuple[str, str, str]]) -> Optional[Dict[str, Dict]]:
+        """Run one GraphQL query for a batch of (key, owner, repo), or None if it failed."""
+        aliases = []
+        for i, (_, owner, repo) in enumerate(batch):
+            # json.dumps gives correctly escaped GraphQL string literals
+            aliases.append(f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)}) "
+                           f"{{{GRAPHQL_REPO_FIELDS}}}")
+        query = "query {\n" + "\n".join(aliases) + "\n}"
+        
+        try:
+            response = self._request('POST', GRAPHQL_API_URL, json={'query': query}, timeout=30)
+            if response.status_code != 200:
+                print(f"GraphQL batch failed: HTTP {response.status_code}")
+                return None
+            payload = response.json()
+        except Exception as e:
+            print(f"GraphQL batch failed: {e}")
+            return None
+        
+        data = payload.get('data')
+        if data is None:
+            print(f"GraphQL batch failed: {payload.get('errors')}")
+            return None
+        
+        # Missing or inaccessible repositories come back as null with a per-alias error
+        for error in payload.get('errors', []):
+            alias = (error.get('path') or [''])[0]
+            if alias.startswith('r') and alias[1:].isdigit() and int(alias[1:]) < len(batch):
+                print(f"Repository not found: {batch[int(alias[1:])][0]}")
+        
+        results = {}
+        for i, (repo_key, _, _) in enumerate(batch):
+            node = data.get(f"r{i}")
+            results[repo_key] = self._graphql_stats(node) if node else {}
+        return results
+    
+    def _graphql_stats(self, node: Dict) -> Dict:
+        """Convert a GraphQL repository node to the stats dict used by fetch_repo_stats."""
+        target = (node.get('defaultBranchRef') or {}).get('target') or {}
+        return {
+            'stars': node.get('stargazerCount', 0),
+            'forks': node.get('forkCount', 0),
+            # REST's watchers_count is the stargazer count, not subscribers
+            'watchers': node.get('stargazerCount', 0),
+            # REST's open_issues_count includes open pull requests
+            'open_issues': node['issues']['totalCount'] + node['pullRequests']['totalCount'],
+            'last_commit': target.get('committedDate', ''),
+            'created_at': node.get('createdAt', ''),
+            'updated_at': node.get('updatedAt', ''),
+            'language': (node.get('primaryLanguage') or {}).get('name', ''),
+            'license': (node.get('licenseInfo') or {}).get('spdxId') or '',
+            'description': node.get('description', ''),
+            'archived': node.get('isArchived', False),
+            'topics': [n['topic']['name'] for n in node['repositoryTopics']['nodes']]
+        }
+    
     def _get_last_commit_date(self, owner: str, repo: str) -> str:
         """Get the date of the last commit."""
         url = f"https://api.github.com/repos/{owner}/{repo}/commits"
         
         try:
-            response = requests.get(url, headers=self.headers, params={'per_page': 1}, timeout=10)
-            if response.status_code == 200:
-                commits = response.json()
+            status, commits = self._get_json(url, params={'per_page': 1})
+            if status == 200:
                 if commits:
                     return commits[0]['commit']['committer']['date']
         except:
@@ -111,15 +381,12 @@ class GitHubStats:
         
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-                # Find all GitHub URLs
-                matches = GITHUB_URL_PATTERN.findall(content)
-                for owner, repo in matches:
-                    # Clean up repo name
-                    repo = repo.rstrip(')')
-                    key = f"{owner}/{repo}"
-                    repos[key] = (owner, repo)
+                links, _ = parse_markdown(f.read())
+            
+            for link in links:
+                repo = github_repo(link.url)
+                if repo and not link.image:
+                    repos[f"{repo[0]}/{repo[1]}"] = repo
                     
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
@@ -132,36 +399,20 @@ class GitHubStats:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            updated = False
+            # GitHub owner/repo names are case-insensitive
+            keys = {repo_key.lower(): repo_key for repo_key in stats}
             
-            for repo_key, repo_stats in stats.items():
-                if not repo_stats:
-                    continue
-                
-                owner, repo = repo_key.split('/')
-                
-                # Update or add stars badge
-                stars = repo_stats.get('stars', 0)
-                stars_badge = f"![GitHub stars](https://img.shields.io/github/stars/{owner}/{repo})"
-                
-                # Update or add last commit badge
-                last_commit_badge = f"![Last commit](https://img.shields.io/github/last-commit/{owner}/{repo})"
-                
-                # Find the line with this repo and update badges
-                pattern = re.compile(rf'\[([^\]]+)\]\(https://github\.com/{owner}/{repo}[^)]*\)[^\n]*')
-                
-                def replace_func(match):
-                    line = match.group(0)
-                    # Remove existing badges
-                    line = re.sub(r'!\[GitHub stars\]\([^)]+\)', '', line)
-                    line = re.sub(r'!\[Last commit\]\([^)]+\)', '', line)
-                    # Add new badges
-                    return f"{line.rstrip()} {stars_badge} {last_commit_badge}"
-                
-                new_content, count = pattern.subn(replace_func, content)
-                if count > 0:
-                    content = new_content
-                    updated = True
+            def badges_for(url: str) -> Optional[List[str]]:
+                repo = github_repo(url)
+                repo_key = keys.get('/'.join(repo).lower()) if repo else None
+                if not repo_key or not stats.get(repo_key):
+                    return None
+                return [f"![GitHub stars](https://img.shields.io/github/stars/{repo_key})",
+                        f"![Last commit](https://img.shields.io/github/last-commit/{repo_key})"]
+            
+            new_content, count = GITHUB_BADGES.rewrite(content, badges_for)
+            updated = count > 0 and new_content != content
+            content = new_content
             
             if updated:
                 with open(file_path, 'w', encoding='utf-8') as f:
@@ -220,8 +471,20 @@ class GitHubStats:
 
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Collect GitHub statistics for the catalog.")
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_API_CACHE_PATH, metavar='PATH',
+                        help=f"persist API responses and revalidate them with ETags (default path: {DEFAULT_API_CACHE_PATH})")
+    parser.add_argument('--max-age', type=float, default=DEFAULT_MAX_AGE / 3600, metavar='HOURS',
+                        help="use cached responses younger than this without any request")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip repositories already fetched by an interrupted run")
+    parser.add_argument('--journal', default=DEFAULT_JOURNAL_PATH, metavar='PATH',
+                        help=f"checkpoint journal of fetched repositories (default: {DEFAULT_JOURNAL_PATH})")
+    args = parser.parse_args()
+    
     # Initialize stats collector
-    stats_collector = GitHubStats()
+    cache = ApiCache(Path(args.cache), max_age=args.max_age * 3600) if args.cache else None
+    stats_collector = GitHubStats(cache=cache)
     
     # Check rate limit
     remaining, reset_time = stats_collector.check_rate_limit()
@@ -234,26 +497,29 @@ def main():
     script_path = Path(__file__).resolve()
     repo_root = script_path.parent.parent
     
-    # Collect all GitHub repos from markdown files
-    all_repos = {}
-    md_files = list(repo_root.glob('**/*.md'))
-    
-    for file_path in md_files:
-        repos = stats_collector.extract_github_repos(file_path)
-        all_repos.update(repos)
+    # Collect all GitHub repos from the markdown catalog
+    catalog = Catalog(repo_root, Path(DEFAULT_CATALOG_PATH))
+    catalog.save()
+    all_repos = catalog.github_repos()
     
     print(f"Found {len(all_repos)} unique GitHub repositories")
     
-    # Fetch statistics
-    all_stats = {}
-    for i, (repo_key, (owner, repo)) in enumerate(all_repos.items(), 1):
-        print(f"Fetching stats for {repo_key} ({i}/{len(all_repos)})...")
-        stats = stats_collector.fetch_repo_stats(owner, repo)
-        all_stats[repo_key] = stats
-        
-        # Rate limiting
-        if i % 10 == 0:
-            time.sleep(1)  # Be nice to GitHub
+    # Repositories checkpointed by an interrupted run are not fetched again
+    journal = StatsJournal(Path(args.journal))
+    done = journal.load() if args.resume else {}
+    if done:
+        print(f"Resuming: {len(done)} repositories already fetched")
+    
+    # Fetch statistics, recording each repository as it finishes
+    journal.open(resume=args.resume)
+    try:
+        fetched = stats_collector.fetch_all_stats(
+            {key: repo for key, repo in all_repos.items() if key not in done},
+            on_result=journal.write
+        )
+    finally:
+        journal.close()
+    all_stats = {key: done.get(key) or fetched.get(key, {}) for key in all_repos}
     
     # Update badges in README
     readme_path = repo_root / 'README.md'
@@ -263,6 +529,12 @@ def main():
     
     # Generate report
     stats_collector.generate_stats_report(all_stats)
+    journal.close(finished=True)
+    
+    if cache is not None:
+        print(f"API cache: {cache.hits} fresh, {cache.revalidated} revalidated (304), "
+              f"{cache.misses} fetched")
+        cache.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
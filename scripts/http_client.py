@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport for the automation scripts.
+Provides one keep-alive requests session per process with per-host
+connection pools, cached DNS lookups and a single retry policy, so repeated
+requests to the same host reuse connections instead of paying for a new
+TCP+TLS handshake each time.
+"""
+
+import socket
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import (
+    MaxRetryError, ReadTimeoutError, ConnectTimeoutError, NewConnectionError
+)
+from urllib3.util.retry import Retry
+from typing import Dict, Optional, Tuple
+
+# Configuration
+POOL_CONNECTIONS = 20  # number of hosts with a kept-alive pool
+POOL_MAXSIZE = 10  # kept-alive connections per host
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 1  # seconds; doubles after each retry
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DNS_TTL = 300  # seconds
+
+_session = None
+_session_lock = threading.Lock()
+_settings = {
+    'pool_connections': POOL_CONNECTIONS,
+    'pool_maxsize': POOL_MAXSIZE,
+    'max_retries': MAX_RETRIES,
+    'dns_ttl': DNS_TTL
+}
+
+def build_retry(max_retries: int = MAX_RETRIES) -> Retry:
+    """Build the retry policy shared by every script."""
+    return Retry(
+        total=max_retries,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'HEAD', 'GET'}),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+
+class _DNSCache:
+    """Process-wide getaddrinfo cache with a fixed TTL."""
+
+    def __init__(self):
+        self.ttl = DNS_TTL
+        self.entries: Dict[Tuple, Tuple[float, list]] = {}
+        self.lock = threading.Lock()
+        self.original = None
+
+    def getaddrinfo(self, host, port, *args, **kwargs):
+        key = (host, port, args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with self.lock:
+            cached = self.entries.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+        result = self.original(host, port, *args, **kwargs)
+        with self.lock:
+            self.entries[key] = (now + self.ttl, result)
+        return result
+
+    def install(self, ttl: float) -> None:
+        """Cache lookups for ttl seconds; a ttl <= 0 removes the cache again."""
+        if ttl <= 0:
+            self.uninstall()
+            return
+        with self.lock:
+            if ttl != self.ttl:
+                # Entries were stored with the old TTL's expiry
+                self.entries.clear()
+            self.ttl = ttl
+        if self.original is None:
+            self.original = socket.getaddrinfo
+            socket.getaddrinfo = self.getaddrinfo
+
+    def uninstall(self) -> None:
+        """Restore socket.getaddrinfo and drop cached lookups."""
+        if self.original is not None:
+            # Leave alone a getaddrinfo someone else patched in after us
+            if socket.getaddrinfo == self.getaddrinfo:
+                socket.getaddrinfo = self.original
+            self.original = None
+        with self.lock:
+            self.entries.clear()
+
+_dns_cache = _DNSCache()
+
+def configure(pool_connections: Optional[int] = None, pool_maxsize: Optional[int] = None,
+              max_retries: Optional[int] = None, dns_ttl: Optional[float] = None) -> None:
+    """Override transport settings. Takes effect for sessions created afterwards,
+    except dns_ttl, which applies at once (0 turns DNS caching off)."""
+    global _session
+    overrides = {
+        'pool_connections': pool_connections,
+        'pool_maxsize': pool_maxsize,
+        'max_retries': max_retries,
+        'dns_ttl': dns_ttl
+    }
+    with _session_lock:
+        _settings.update({k: v for k, v in overrides.items() if v is not None})
+        if _session is not None:
+            _session.close()
+            _session = None
+        if dns_ttl is not None and _dns_cache.original is not None:
+            _dns_cache.install(dns_ttl)
+
+def create_session(max_retries: Optional[int] = None) -> requests.Session:
+    """Create a new pooled session using the configured transport settings."""
+    _dns_cache.install(_settings['dns_ttl'])
+
+    retries = _settings['max_retries'] if max_retries is None else max_retries
+    adapter = HTTPAdapter(
+        pool_connections=_settings['pool_connections'],
+        pool_maxsize=_settings['pool_maxsize'],
+        max_retries=build_retry(retries)
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_session() -> requests.Session:
+    """Return the process-wide shared session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+def is_timeout(exc: Exception) -> bool:
+    """Whether a request exception was caused by a timeout, including after retries."""
+    if isinstance(exc, requests.exceptions.Timeout):
+        return True
+    reason = exc.args[0] if exc.args else None
+    if isinstance(reason, MaxRetryError):
+        # NewConnectionError subclasses ConnectTimeoutError but means refused/unreachable
+        if isinstance(reason.reason, NewConnectionError):
+            return False
+        return isinstance(reason.reason, (ReadTimeoutError, ConnectTimeoutError))
+    return False
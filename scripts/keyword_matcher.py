@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Compiled keyword matching for tool categorization.
+Compiles a {category_type: {subcategory: [keywords]}} table once into a single
+word-boundary regex, so every category hit in a description is found in one
+pass instead of one substring scan per keyword.
+"""
+
+import re
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+# Keywords also match common inflections ('evolution' matches 'evolutionary'),
+# but never arbitrary longer words ('meta' does not match 'metabolism')
+KEYWORD_SUFFIXES = ['s', 'es', 'ed', 'ing', 'al', 'ally', 'ary', 'ic', 'ity']
+# Spaces and hyphens inside keywords are interchangeable ('deep-learning')
+WORD_GAP = re.compile(r'[\s-]+')
+# Joins batched texts; never part of a keyword and always a word boundary
+SEPARATOR = '\n\x00\n'
+
+class KeywordMatcher:
+    def __init__(self, table: Dict[str, Dict[str, List[str]]]):
+        """Compile a category keyword table (matching is case-insensitive, whole words only)."""
+        self.labels: List[Tuple[str, str]] = []  # (category_type, subcategory) in table order
+        keyword_labels = defaultdict(set)
+        for category_type, subcategories in table.items():
+            for subcategory, keywords in subcategories.items():
+                label = len(self.labels)
+                self.labels.append((category_type, subcategory))
+                for keyword in keywords:
+                    keyword_labels[WORD_GAP.sub(' ', keyword.lower())].add(label)
+
+        # The regex consumes the longest keyword at each position, so a hit also
+        # credits shorter keywords inside it ('structural variant' -> 'structural')
+        keywords = sorted(keyword_labels, key=len, reverse=True)
+        self.hits: Dict[str, frozenset] = {}
+        self._grouped: Dict[frozenset, Dict[str, List[str]]] = {}
+        for keyword in keywords:
+            labels = set(keyword_labels[keyword])
+            for other in keywords:
+                if other != keyword and re.search(rf'(?<!\w){re.escape(other)}(?!\w)', keyword):
+                    labels |= keyword_labels[other]
+            self.hits[keyword] = frozenset(labels)
+
+        # Texts are lowercased before matching; re.IGNORECASE is several times slower
+        alternatives = '|'.join(r'[\s-]+'.join(map(re.escape, keyword.split(' '))) for keyword in keywords)
+        suffixes = '|'.join(KEYWORD_SUFFIXES)
+        self.pattern = re.compile(rf'(?<!\w)({alternatives})(?:{suffixes})?(?!\w)')
+
+    def _hits_for(self, matched: str) -> frozenset:
+        hits = self.hits.get(matched)
+        return hits if hits is not None else self.hits[WORD_GAP.sub(' ', matched)]
+
+    def _categories(self, labels: Iterable[int]) -> Dict[str, List[str]]:
+        key = frozenset(labels)
+        if key not in self._grouped:
+            self._grouped[key] = self._group(key)
+        # Copy so callers can modify their result
+        return {category_type: list(subcategories)
+                for category_type, subcategories in self._grouped[key].items()}
+
+    def _group(self, labels: Iterable[int]) -> Dict[str, List[str]]:
+        categories = defaultdict(list)
+        for label in sorted(labels):
+            category_type, subcategory = self.labels[label]
+            categories[category_type].append(subcategory)
+        return dict(categories)
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """Return {category_type: [subcategories]} hit by the text, in table order."""
+        labels = set()
+        for match in self.pattern.finditer(text.lower()):
+            labels |= self._hits_for(match.group(1))
+        return self._categories(labels)
+
+    def match_many(self, texts: List[str]) -> List[Dict[str, List[str]]]:
+        """Categorize many texts with a single scan over their concatenation."""
+        # Lowercase per text: lower() can change lengths, which would shift the offsets
+        texts = [text.lower() for text in texts]
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + len(SEPARATOR)
+
+        labels = [set() for _ in texts]
+        for match in self.pattern.finditer(SEPARATOR.join(texts)):
+            labels[bisect_right(starts, match.start()) - 1] |= self._hits_for(match.group(1))
+        return [self._categories(hit) for hit in labels]
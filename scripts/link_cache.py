@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Persistent link-check result store for the link checker.
+Records status and HTTP validators per URL in SQLite so later runs can skip
+fresh entries and revalidate stale ones with conditional requests.
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from sqlite_store import SQLiteStore, conditional_headers
+
+# Configuration
+DEFAULT_CACHE_PATH = '.link_cache.sqlite'
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+HOST_MEMO_TTL = 30 * 24 * 60 * 60  # seconds before a host's HEAD support is re-learned
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL for use as a cache key."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    netloc = host
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+    # Fragments never reach the server
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+def canonical_url(url: str) -> str:
+    """Key that groups variants of the same resource.
+    
+    Ignores the scheme (http vs https), host case, default ports, fragments
+    and trailing slashes, so each resource is checked once.
+    """
+    parts = urlsplit(normalize_url(url))
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit(('', parts.netloc, path, parts.query, ''))
+
+class LinkCache(SQLiteStore):
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS links (
+            url TEXT PRIMARY KEY,
+            is_valid INTEGER NOT NULL,
+            status INTEGER,
+            message TEXT NOT NULL,
+            checked_at REAL NOT NULL,
+            etag TEXT,
+            last_modified TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS redirects (
+            source TEXT PRIMARY KEY,
+            target TEXT NOT NULL,
+            checked_at REAL NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS hosts (
+            host TEXT PRIMARY KEY,
+            head_ok INTEGER NOT NULL,
+            checked_at REAL NOT NULL
+        )""",
+    ]
+
+    def __init__(self, path: Path = Path(DEFAULT_CACHE_PATH), ttl: float = DEFAULT_TTL):
+        """Open (or create) the result store at path."""
+        super().__init__(path)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the stored entry for a URL, fresh or not."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT is_valid, status, message, checked_at, etag, last_modified "
+                "FROM links WHERE url = ?",
+                (normalize_url(url),)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'is_valid': bool(row[0]),
+            'status': row[1],
+            'message': row[2],
+            'checked_at': row[3],
+            'etag': row[4],
+            'last_modified': row[5]
+        }
+
+    def is_fresh(self, entry: Dict) -> bool:
+        """Whether an entry is recent enough to skip the network entirely."""
+        # Broken links are always rechecked so fixes show up immediately
+        return entry['is_valid'] and time.time() - entry['checked_at'] < self.ttl
+
+    def lookup(self, url: str, alias: Optional[str] = None) -> Optional[Dict]:
+        """Return the fresh entry for a URL (or its known redirect target), counting hits and misses."""
+        for candidate in (url, alias):
+            entry = self.get(candidate) if candidate else None
+            if entry and self.is_fresh(entry):
+                self.hits += 1
+                return entry
+        self.misses += 1
+        return None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Build If-None-Match/If-Modified-Since headers from stored validators."""
+        entry = self.get(url)
+        if not entry or not entry['is_valid']:
+            return {}
+        return conditional_headers(entry['etag'], entry['last_modified'])
+
+    def record(self, url: str, is_valid: bool, status: Optional[int], message: str,
+               etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Store a check result. A 304 refreshes the timestamp and keeps validators."""
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            if status == 304:
+                self.revalidated += 1
+                self._conn.execute(
+                    "UPDATE links SET checked_at = ?, is_valid = 1 WHERE url = ?",
+                    (now, key)
+                )
+            else:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO links "
+                    "(url, is_valid, status, message, checked_at, etag, last_modified) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, int(is_valid), status, message, now, etag, last_modified)
+                )
+            self._conn.commit()
+
+    def load_redirects(self) -> Dict[str, str]:
+        """Return remembered redirects (canonical source -> final URL) within the TTL."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, target FROM redirects WHERE checked_at > ?",
+                (time.time() - self.ttl,)
+            ).fetchall()
+        return dict(rows)
+
+    def save_redirects(self, redirects: Dict[str, str]) -> None:
+        """Persist redirects observed during a run."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO redirects (source, target, checked_at) VALUES (?, ?, ?)",
+                [(source, target, now) for source, target in list(redirects.items())]
+            )
+            self._conn.commit()
+
+    def load_head_support(self) -> Dict[str, bool]:
+        """Return the remembered HEAD support of each host, dropping old entries."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT host, head_ok FROM hosts WHERE checked_at > ?",
+                (time.time() - HOST_MEMO_TTL,)
+            ).fetchall()
+        return {host: bool(head_ok) for host, head_ok in rows}
+
+    def save_head_support(self, head_support: Dict[str, bool]) -> None:
+        """Persist what was learned about each host's HEAD support."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hosts (host, head_ok, checked_at) VALUES (?, ?, ?)",
+                [(host, int(head_ok), now) for host, head_ok in list(head_support.items())]
+            )
+            self._conn.commit()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Streaming result output for the link checker.
+Writes one record per link occurrence as soon as its URL has been checked,
+as JSON Lines or SARIF, and rebuilds the per-file results structure used by
+generate_report from either format so partial runs are still useful.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_TOOL = "awesome-vep-linkchecker"
+SARIF_RULE = "broken-link"
+SARIF_TAIL = "]}]}\n"
+
+def _format_for(path: Path) -> str:
+    """Pick the output format from the file extension."""
+    return 'sarif' if path.suffix.lower() == '.sarif' else 'jsonl'
+
+class ResultSink:
+    def __init__(self, path: Path, fmt: Optional[str] = None):
+        """Open a streaming output file (format inferred from the extension if not given)."""
+        self.path = Path(path)
+        self.format = fmt or _format_for(self.path)
+        self.count = 0
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+        if self.format == 'sarif':
+            header = {
+                '$schema': SARIF_SCHEMA,
+                'version': '2.1.0',
+                'runs': [{
+                    'tool': {'driver': {
+                        'name': SARIF_TOOL,
+                        'rules': [{'id': SARIF_RULE,
+                                   'shortDescription': {'text': 'Link is not reachable'}}]
+                    }},
+                    'results': []
+                }]
+            }
+            # Leave the results array open so entries can be appended as they finish
+            text = json.dumps(header)
+            self._file.write(text[:-len(']}]}')])
+            self._file.flush()
+
+    def write(self, file: str, line: int, url: str, text: str, is_valid: bool,
+              message: str, status: Optional[int] = None, latency: float = 0.0) -> None:
+        """Write one link occurrence and flush it to disk."""
+        if self.format == 'sarif':
+            entry = {
+                'ruleId': SARIF_RULE,
+                'kind': 'pass' if is_valid else 'fail',
+                'level': 'none' if is_valid else 'error',
+                'message': {'text': f"[{text}]({url}) - {message}"},
+                'locations': [{'physicalLocation': {
+                    'artifactLocation': {'uri': file},
+                    'region': {'startLine': line}
+                }}],
+                'properties': {
+                    'url': url, 'text': text, 'status': status,
+                    'result': message, 'latency_ms': round(latency * 1000, 1)
+                }
+            }
+            self._file.write((',' if self.count else '') + json.dumps(entry))
+        else:
+            record = {
+                'file': file, 'line': line, 'url': url, 'text': text,
+                'valid': is_valid, 'message': message, 'status': status,
+                'latency_ms': round(latency * 1000, 1)
+            }
+            self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        """Finish the output file."""
+        if self.format == 'sarif':
+            self._file.write(SARIF_TAIL)
+        self._file.close()
+
+def load_results(path: Path) -> Dict[str, List[Tuple[str, str, int, bool, str]]]:
+    """Rebuild generate_report's per-file results from a JSONL or SARIF stream.
+
+    Truncated files from interrupted runs are read up to the last complete record.
+    """
+    path = Path(path)
+    results = {}
+
+    def add(file, url, text, line, is_valid, message):
+        results.setdefault(file, []).append((url, text, line, is_valid, message))
+
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    if _format_for(path) == 'sarif':
+        data = None
+        # Interrupted runs: close the document as is, else drop the partial last entry
+        cut = content.rfind('},{"ruleId"')
+        candidates = [content, content + SARIF_TAIL]
+        if cut >= 0:
+            candidates.append(content[:cut + 1] + SARIF_TAIL)
+        for candidate in candidates:
+            try:
+                data = json.loads(candidate)
+                break
+            except json.JSONDecodeError:
+                continue
+        if data is None:
+            raise ValueError(f"Unreadable SARIF stream: {path}")
+        for run in data.get('runs', []):
+            for entry in run.get('results', []):
+                props = entry.get('properties', {})
+                location = entry['locations'][0]['physicalLocation']
+                add(location['artifactLocation']['uri'], props.get('url', ''), props.get('text', ''),
+                    location['region']['startLine'], entry.get('kind') == 'pass',
+                    props.get('result', ''))
+    else:
+        for raw in content.splitlines():
+            try:
+                record = json.loads(raw)
+            except json.JSONDecodeError:
+                continue  # partial last line of an interrupted run
+            add(record['file'], record['url'], record['text'], record['line'],
+                record['valid'], record['message'])
+
+    # Records arrive in completion order; report them in document order
+    for links in results.values():
+        links.sort(key=lambda link: link[2])
+
+    return results
+
+def merge_results(paths: Iterable[Path]) -> Dict[str, List[Tuple[str, str, int, bool, str]]]:
+    """Combine partial result files (e.g. one per shard) into one per-file structure."""
+    merged = {}
+    for path in paths:
+        for file, links in load_results(path).items():
+            merged.setdefault(file, []).extend(links)
+
+    for links in merged.values():
+        links.sort(key=lambda link: link[2])
+
+    return merged
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Retry scheduling and per-host circuit breaking for the link checker.
+Failed checks are put back on a delay queue instead of sleeping inside a
+worker, Retry-After and 429 responses pause the affected host, and hosts
+that keep refusing connections are marked down without further requests.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+import http_client
+
+# Configuration
+HOST_FAILURE_THRESHOLD = 5  # consecutive connection failures before a host is marked down
+MAX_RETRY_DELAY = 60  # seconds; longer Retry-After values are not waited for
+
+class Probe(NamedTuple):
+    """Outcome of a single check attempt."""
+    url: str
+    is_valid: bool
+    message: str
+    status: Optional[int] = None
+    headers: Optional[Mapping[str, str]] = None
+    connection_failed: bool = False  # timeout or connection error
+    latency: float = 0.0  # seconds spent on the request(s)
+    redirects: Tuple[str, ...] = ()  # URLs passed through before final_url
+    final_url: Optional[str] = None
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def is_retryable(probe: Probe) -> bool:
+    """Whether an attempt failed in a way worth retrying."""
+    return probe.connection_failed or probe.status in http_client.RETRY_STATUSES
+
+def retry_delay(probe: Probe, attempt: int) -> Optional[float]:
+    """Seconds to wait before the next attempt, or None if it is not worth waiting."""
+    retry_after = parse_retry_after((probe.headers or {}).get('Retry-After'))
+    if retry_after is not None:
+        return retry_after if retry_after <= MAX_RETRY_DELAY else None
+    return min(http_client.BACKOFF_FACTOR * 2 ** (attempt - 1), MAX_RETRY_DELAY)
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = HOST_FAILURE_THRESHOLD):
+        """Track consecutive connection failures and pauses per host."""
+        self.threshold = threshold
+        self.failures: Dict[str, int] = {}
+        self.paused_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, host: str, probe: Probe) -> None:
+        """Update a host's state from an attempt's outcome."""
+        with self._lock:
+            if probe.connection_failed:
+                self.failures[host] = self.failures.get(host, 0) + 1
+            elif self.failures.get(host, 0) < self.threshold:
+                self.failures[host] = 0
+
+            # A 429 or Retry-After applies to the whole host, not just this URL
+            if probe.status == 429 or (probe.headers or {}).get('Retry-After'):
+                delay = parse_retry_after((probe.headers or {}).get('Retry-After'))
+                delay = min(delay if delay is not None else http_client.BACKOFF_FACTOR,
+                            MAX_RETRY_DELAY)
+                until = time.monotonic() + delay
+                self.paused_until[host] = max(self.paused_until.get(host, 0), until)
+
+    def is_open(self, host: str) -> bool:
+        """Whether a host has failed often enough to be treated as down."""
+        with self._lock:
+            return self.failures.get(host, 0) >= self.threshold
+
+    def wait_time(self, host: str) -> float:
+        """Seconds until a paused host may be contacted again."""
+        with self._lock:
+            return max(0.0, self.paused_until.get(host, 0) - time.monotonic())
+
+    def down_message(self, host: str) -> str:
+        """Result message for URLs skipped because their host is down."""
+        return f"Host down ({self.threshold}+ consecutive connection failures)"
+
+class RetryQueue:
+    """Min-heap of items waiting for their next attempt."""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._counter = itertools.count()
+
+    def push(self, item: Any, delay: float) -> None:
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), item))
+
+    def pop_due(self) -> List[Any]:
+        """Remove and return every item whose delay has elapsed."""
+        now = time.monotonic()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def next_delay(self) -> Optional[float]:
+        """Seconds until the next item is due, or None when empty."""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._heap)
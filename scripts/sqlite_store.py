@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Shared SQLite plumbing for the persistent stores.
+Opens a store's database once with WAL journaling and a lock so worker
+threads can share the connection, creates its tables, and builds the
+conditional request headers used to revalidate cached HTTP responses.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+class SQLiteStore:
+    # CREATE TABLE/INDEX IF NOT EXISTS statements run when the store is opened
+    SCHEMA: List[str] = []
+
+    def __init__(self, path: Path):
+        """Open (or create) the store at path."""
+        self.path = Path(path)
+        # Shared by concurrent worker threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for statement in self.SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        with self._lock:
+            self._conn.close()
+
+def conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> Dict[str, str]:
+    """Build If-None-Match/If-Modified-Since headers from stored validators."""
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    return headers
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+TF-IDF nearest-neighbour category suggestions for uncategorized tools.
+Builds one sparse TF-IDF matrix over all tool descriptions and scores every
+unlabeled description against the labeled ones with batched sparse matrix
+products, suggesting the categories of its most similar labeled tools with a
+confidence score. Requires numpy and scipy.
+"""
+
+import re
+from typing import Dict, Hashable, List, Tuple
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # numpy/scipy are only needed for category suggestions
+    np = None
+    sparse = None
+
+# Configuration
+NEIGHBOURS = 5  # labeled tools that vote on each suggestion
+MIN_CONFIDENCE = 0.3  # share of the neighbours' similarity behind a suggested label
+MIN_SIMILARITY = 0.05  # neighbours less similar than this do not vote
+CHUNK_CELLS = 1 << 23  # similarity matrix cells scored per batch (bounds memory)
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+STOP_WORDS = frozenset("""
+a an and are as at based be by for from in into is it its of on or that the this
+to tool tools using uses via with variant variants effect effects predict predicts
+prediction predictor predictors
+""".split())
+
+def available() -> bool:
+    """Whether numpy and scipy are installed."""
+    return np is not None and sparse is not None
+
+class TfidfClassifier:
+    def __init__(self, neighbours: int = NEIGHBOURS, min_confidence: float = MIN_CONFIDENCE):
+        """Set up a k-nearest-neighbour classifier over TF-IDF vectors."""
+        if not available():
+            raise RuntimeError("numpy and scipy are required for category suggestions: "
+                               "pip install numpy scipy")
+        self.neighbours = neighbours
+        self.min_confidence = min_confidence
+
+    def vectorize(self, texts: List[str]):
+        """Return the L2-normalized sparse TF-IDF matrix (one row per text)."""
+        vocabulary = {}
+        rows, columns = [], []
+        for row, text in enumerate(texts):
+            for token in TOKEN_PATTERN.findall(text.lower()):
+                if token not in STOP_WORDS and len(token) > 1:
+                    rows.append(row)
+                    columns.append(vocabulary.setdefault(token, len(vocabulary)))
+
+        counts = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+            shape=(len(texts), len(vocabulary))
+        )
+        counts.sum_duplicates()
+
+        # Smoothed IDF, sublinear TF
+        document_frequency = np.bincount(counts.indices, minlength=len(vocabulary))
+        idf = np.log((1 + len(texts)) / (1 + document_frequency)).astype(np.float32) + 1
+        counts.data = (1 + np.log(counts.data)) * idf[counts.indices]
+
+        norms = np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms).dot(counts).tocsr()
+
+    def suggest(self, texts: List[str],
+                labels: List[List[Hashable]]) -> Dict[int, List[Tuple[Hashable, float]]]:
+        """Suggest labels for every text without labels, from the texts that have them.
+
+        Returns {text index: [(label, confidence), ...]} with the most confident
+        label first; texts with no confident suggestion are left out.
+        """
+        matrix = self.vectorize(texts)
+        labeled = [i for i, text_labels in enumerate(labels) if text_labels]
+        unlabeled = [i for i, text_labels in enumerate(labels) if not text_labels]
+        if not labeled or not unlabeled:
+            return {}
+
+        # Labeled tools x labels indicator matrix
+        label_names = sorted(set(label for i in labeled for label in labels[i]), key=str)
+        label_index = {label: j for j, label in enumerate(label_names)}
+        pairs = [(row, label_index[label]) for row, i in enumerate(labeled) for label in labels[i]]
+        indicator = sparse.csr_matrix(
+            (np.ones(len(pairs), dtype=np.float32), tuple(zip(*pairs))),
+            shape=(len(labeled), len(label_names))
+        )
+
+        reference = matrix[labeled].T.tocsr()
+        queries = matrix[unlabeled]
+        k = min(self.neighbours, len(labeled))
+        chunk = max(1, CHUNK_CELLS // len(labeled))
+        suggestions = {}
+
+        for start in range(0, len(unlabeled), chunk):
+            # Cosine similarity of a batch of unlabeled tools to every labeled tool
+            similarity = queries[start:start + chunk].dot(reference).toarray()
+            nearest = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+            weights = np.take_along_axis(similarity, nearest, axis=1)
+            weights[weights < MIN_SIMILARITY] = 0
+
+            # Similarity-weighted label votes of the k nearest labeled tools
+            votes = sparse.csr_matrix(
+                (weights.ravel(), (np.repeat(np.arange(len(weights)), k), nearest.ravel())),
+                shape=(len(weights), len(labeled))
+            ).dot(indicator).toarray()
+            totals = weights.sum(axis=1, keepdims=True)
+            confidence = np.divide(votes, totals, out=np.zeros_like(votes), where=totals > 0)
+
+            for row, column in zip(*np.nonzero(confidence >= self.min_confidence)):
+                suggestions.setdefault(unlabeled[start + row], []).append(
+                    (label_names[column], float(confidence[row, column])))
+
+        for suggested in suggestions.values():
+            suggested.sort(key=lambda item: item[1], reverse=True)
+        return suggestions
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Rate-limit budgets and token rotation for the GitHub statistics collector.
+Keeps a live budget per token and rate-limit resource from X-RateLimit-*
+response headers, sends each request through the token with the most budget
+left, and only waits when every token is spent.
+"""
+
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+# Configuration
+RESOURCES = ('core', 'graphql')
+
+class RateLimitBudget:
+    def __init__(self):
+        """Track one token's budget for one rate-limit resource."""
+        self.remaining: Optional[int] = None  # unknown until the first response
+        self.reset = 0.0  # epoch seconds when the window resets
+        self.in_flight = 0
+
+    def update(self, remaining: int, reset: float) -> None:
+        """Record the budget reported by a response."""
+        if self.remaining is None or reset > self.reset:
+            self.remaining, self.reset = remaining, reset
+        elif reset == self.reset:
+            # Responses finish out of order; the lowest count is the latest
+            self.remaining = min(self.remaining, remaining)
+
+    def room(self, now: float) -> int:
+        """Requests that may be started right now."""
+        if self.remaining is not None and now >= self.reset:
+            self.remaining = None  # new window: learn its budget from one request
+        if self.remaining is None:
+            return 1 if self.in_flight == 0 else 0
+        return self.remaining - self.in_flight
+
+def tokens_from_env() -> List[str]:
+    """Read tokens from GITHUB_TOKENS (comma or whitespace separated) and GITHUB_TOKEN."""
+    tokens = re.split(r'[\s,]+', os.environ.get('GITHUB_TOKENS', ''))
+    tokens.append(os.environ.get('GITHUB_TOKEN', ''))
+    return list(dict.fromkeys(token for token in tokens if token))
+
+class TokenPool:
+    def __init__(self, tokens: List[Optional[str]]):
+        """Create a budget per token and resource (an empty list means unauthenticated)."""
+        self.tokens = list(dict.fromkeys(tokens)) or [None]
+        self.budgets = {token: {resource: RateLimitBudget() for resource in RESOURCES}
+                        for token in self.tokens}
+        self._announced = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, resource: str) -> Optional[str]:
+        """Reserve a request on the token with the most budget left, waiting if all are spent."""
+        with self._cond:
+            while True:
+                now = time.time()
+                best, best_room = None, 0
+                for token in self.tokens:
+                    room = self.budgets[token][resource].room(now)
+                    if room > best_room:
+                        best, best_room = token, room
+                if best_room > 0:
+                    self.budgets[best][resource].in_flight += 1
+                    return best
+
+                # Every token is spent: wait for a response or the earliest reset
+                budgets = [self.budgets[token][resource] for token in self.tokens]
+                resets = [b.reset for b in budgets if b.remaining is not None]
+                idle = all(b.in_flight == 0 for b in budgets)
+                if resets and idle and self._announced != min(resets):
+                    self._announced = min(resets)
+                    print(f"Rate limit budget used up on all {len(self.tokens)} token(s). "
+                          f"Pausing until {datetime.fromtimestamp(min(resets)):%H:%M:%S}")
+                self._cond.wait(timeout=max(0.0, min(resets) - now) if resets else None)
+
+    def release(self, token: Optional[str], resource: str, remaining: Optional[int] = None,
+                reset: Optional[float] = None) -> None:
+        """Return a reservation, recording the budget its response reported."""
+        with self._cond:
+            budget = self.budgets[token][resource]
+            budget.in_flight -= 1
+            if remaining is not None and reset is not None:
+                budget.update(remaining, reset)
+            self._cond.notify_all()
+
+    def update(self, token: Optional[str], resource: str, remaining: int, reset: float) -> None:
+        """Record a budget learned outside a request (e.g. from the rate_limit endpoint)."""
+        with self._cond:
+            self.budgets[token][resource].update(remaining, reset)
+            self._cond.notify_all()
+
+    def pause(self, token: Optional[str], resource: str, seconds: float) -> None:
+        """Stop using a token for a while (secondary rate limit / Retry-After)."""
+        with self._cond:
+            budget = self.budgets[token][resource]
+            budget.remaining = 0
+            budget.reset = max(budget.reset, time.time() + seconds)